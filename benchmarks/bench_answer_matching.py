@@ -0,0 +1,49 @@
+"""
+Micro-benchmark of answer matching against the old exact-match path.
+
+Run from the repository root: python -m benchmarks.bench_answer_matching
+"""
+import timeit
+
+from games.answer_matching import AnswerKey, normalize
+
+from benchmarks.harness import result, time_sync
+
+
+ANSWER = "Grand Theft Auto: Vice City"
+GUESSES = {
+    'exact': "Grand Theft Auto: Vice City",
+    'typo': "grand theft auto vice cty",
+    'wrong': "Red Dead Redemption",
+    'chatter': "lol no idea, maybe the one with the boats?",
+}
+NUMBER = 100_000
+
+
+def exact_match(guess, answer=ANSWER):
+    """The matching TriviaGame.handle_answer used before answer_matching existed."""
+    return guess.strip().lower() == answer.strip().lower()
+
+
+def main():
+    answer_key = AnswerKey(ANSWER)
+    print(f"{'guess':<10}{'exact (us)':>14}{'fuzzy (us)':>14}  exact / fuzzy result")
+    for name, guess in GUESSES.items():
+        exact_time = timeit.timeit(lambda: exact_match(guess), number=NUMBER) / NUMBER * 1e6
+        fuzzy_time = timeit.timeit(lambda: answer_key.matches(normalize(guess)), number=NUMBER) / NUMBER * 1e6
+        result = f"{exact_match(guess)} / {answer_key.matches(normalize(guess))}"
+        print(f"{name:<10}{exact_time:>14.3f}{fuzzy_time:>14.3f}  {result}")
+
+
+async def collect(quick=False):
+    """Fuzzy matching results for the benchmark suite in benchmarks.run."""
+    answer_key = AnswerKey(ANSWER)
+    number = NUMBER // 10
+    return [
+        result('answer_matching.matches', time_sync(lambda: answer_key.matches(normalize(guess)), number), guess=name)
+        for name, guess in GUESSES.items()
+    ]
+
+
+if __name__ == '__main__':
+    main()
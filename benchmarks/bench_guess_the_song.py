@@ -0,0 +1,70 @@
+"""
+GuessTheSongGame.ask_song and handle_answer, and building the track table,
+with large playlists. Songs are resolved instantly and play on a fake voice
+client, so only the game's own work is timed.
+"""
+from games.guess_the_song.track_table import TrackTable
+
+from benchmarks.harness import (
+    LoadTestSongGame, result, time_sync, time_async, players, text_channel, voice_channel, message, playlist,
+)
+
+
+PLAYLIST_SIZES = (1_000, 10_000, 50_000)
+QUICK_PLAYLIST_SIZES = (1_000, 10_000)
+NUMBER = 2_000
+
+
+class InstantPrefetcher:
+    """Hands out the next track of the table, already 'resolved'."""
+    def __init__(self, game):
+        self.game = game
+
+
+    async def get(self):
+        track = self.game.track_table.draw()
+        return track, f"https://example.invalid/{track.track_id}"
+
+
+    def stop(self):
+        pass
+
+
+async def collect(quick=False):
+    results = []
+    for size in QUICK_PLAYLIST_SIZES if quick else PLAYLIST_SIZES:
+        rows = playlist(size)
+        results.append(result('song.build_track_table', time_sync(lambda: TrackTable(rows), number=1, repeat=3), playlist_size=size))
+
+        channel = text_channel()
+        game_players = players(8)
+        game = LoadTestSongGame(None, channel, voice_channel(channel), game_players, tracks=rows, resolve_latency=0)
+        await game.join_voice_channel()
+        game.track_table = TrackTable(rows)
+        game.prefetcher = InstantPrefetcher(game)
+
+        async def ask_song():
+            game.question_active = False
+            await game.ask_song()
+        results.append(result('song.ask_song', await time_async(ask_song, NUMBER), playlist_size=size))
+
+        await game.ask_song()
+        author = game_players[0]
+        track = game.current_track
+        wrong = message(author, channel, "is it the one with the boats?")
+        title = message(author, channel, track.name.split(' - ')[0])
+
+        async def handle_wrong():
+            await game.handle_answer(wrong)
+        results.append(result('song.handle_answer.wrong', await time_async(handle_wrong, NUMBER), playlist_size=size))
+
+        async def handle_title():
+            # Reopen the title so every call scores it; the artists stay open, so the round goes on
+            game.question_active = True
+            game.answer_keys = [game.song_key, *track.artist_keys]
+            game.song_guessed = False
+            await game.handle_answer(title)
+        results.append(result('song.handle_answer.title', await time_async(handle_title, NUMBER), playlist_size=size))
+
+        await game.end_game()
+    return results
@@ -0,0 +1,32 @@
+"""
+display_leaderboard of Trivia and Guess the Song with many players.
+"""
+import random
+
+from games.trivia.trivia import TriviaGame
+from games.trivia.topics import TRIVIA_TOPICS
+
+from benchmarks.harness import LoadTestSongGame, result, time_async, players, text_channel, voice_channel
+
+
+PLAYER_COUNTS = (10, 1_000, 10_000)
+QUICK_PLAYER_COUNTS = (10, 1_000)
+NUMBER = 200
+
+
+async def collect(quick=False):
+    results = []
+    rng = random.Random(0)
+    for count in QUICK_PLAYER_COUNTS if quick else PLAYER_COUNTS:
+        game_players = players(count)
+
+        channel = text_channel()
+        trivia = TriviaGame(None, channel, game_players, "all_topics", TRIVIA_TOPICS.deck("all_topics"))
+        trivia.scores = {player.id: rng.randrange(50) for player in game_players}
+        results.append(result('trivia.display_leaderboard', await time_async(trivia.display_leaderboard, NUMBER), players=count))
+
+        channel = text_channel()
+        song = LoadTestSongGame(None, channel, voice_channel(channel), game_players, tracks=[], resolve_latency=0)
+        song.scores = {player.id: rng.randrange(50) for player in game_players}
+        results.append(result('song.display_leaderboard', await time_async(song.display_leaderboard, NUMBER), players=count))
+    return results
@@ -0,0 +1,36 @@
+"""
+ThreeManGame.apply_rules over all 36 dice outcomes.
+"""
+import itertools
+
+from games.threeman import ThreeManGame
+
+from benchmarks.harness import result, time_async, players, text_channel
+
+
+OUTCOMES = [(die1, die2, die1 + die2) for die1, die2 in itertools.product(range(1, 7), repeat=2)]
+NUMBER = 2_000
+
+
+class Followups:
+    """Collects rule messages like the follow-up outbox, without sending them."""
+    def __init__(self):
+        self.sent = []
+
+
+    def send(self, content):
+        self.sent.append(content)
+
+
+async def collect(quick=False):
+    game = ThreeManGame(None, text_channel(), players(6))
+    await game.start_game()
+    game.threeman = game.players[1]
+    followups = Followups()
+
+    async def all_outcomes():
+        followups.sent.clear()
+        for die1, die2, total in OUTCOMES:
+            await game.apply_rules(followups, die1, die2, total)
+
+    return [result('threeman.apply_rules.36_outcomes', await time_async(all_outcomes, NUMBER))]
@@ -0,0 +1,61 @@
+"""
+TriviaGame.ask_question and handle_answer, and loading the question bank, at
+growing bank sizes.
+"""
+from games.trivia.trivia import TriviaGame
+from games.trivia.question_bank import QuestionBank, ALL_TOPICS
+
+from benchmarks.harness import result, time_sync, time_async, players, text_channel, message, write_question_bank
+
+
+BANK_SIZES = (1_000, 10_000, 100_000)
+QUICK_BANK_SIZES = (1_000, 10_000)
+NUMBER = 2_000
+
+
+def new_game(bank, player_count=8):
+    channel = text_channel()
+    game_players = players(player_count)
+    game = TriviaGame(None, channel, game_players, ALL_TOPICS, bank.deck(ALL_TOPICS))
+    return game, channel, game_players
+
+
+async def collect(quick=False):
+    results = []
+    for size in QUICK_BANK_SIZES if quick else BANK_SIZES:
+        path = write_question_bank(size)
+
+        def load_bank():
+            bank = QuestionBank(path)
+            bank.deck(ALL_TOPICS)
+        results.append(result('trivia.load_bank', time_sync(load_bank, number=1, repeat=3), bank_size=size))
+
+        bank = QuestionBank(path)
+        game, channel, game_players = new_game(bank)
+
+        async def ask_question():
+            if not game.deck:
+                game.deck = bank.deck(ALL_TOPICS)
+            await game.ask_question()
+        results.append(result('trivia.ask_question', await time_async(ask_question, NUMBER), bank_size=size))
+
+        author = game_players[0]
+        await game.ask_question()
+        answer_keys = game.answer_keys
+        wrong = message(author, channel, "is it the one with the boats?")
+        correct = message(author, channel, game.current_question['answer'])
+
+        async def handle_wrong():
+            await game.handle_answer(wrong)
+        results.append(result('trivia.handle_answer.wrong', await time_async(handle_wrong, NUMBER), bank_size=size))
+
+        async def handle_correct():
+            # Reopen the same question; question 1 never shows the leaderboard
+            game.question_active = True
+            game.answer_keys = answer_keys
+            game.question_counter = 1
+            await game.handle_answer(correct)
+        results.append(result('trivia.handle_answer.correct', await time_async(handle_correct, NUMBER), bank_size=size))
+
+        await game.end_game()
+    return results
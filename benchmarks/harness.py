@@ -0,0 +1,79 @@
+"""
+Timing helpers and fakes shared by the benchmark suite in benchmarks.run.
+"""
+import os
+import json
+import time
+import tempfile
+
+# Importing the load test points the stats, snapshots and caches at a scratch directory
+from loadtest.driver import LoadTestSongGame
+from loadtest.fake_discord import FakeUser, FakeGuild, FakeTextChannel, FakeVoiceChannel, FakeMessage
+
+
+def result(name, seconds, **params):
+    """One benchmark result; params become part of the name so runs can be compared."""
+    if params:
+        name += "[" + ",".join(f"{key}={value}" for key, value in params.items()) + "]"
+    return {'name': name, 'us_per_op': seconds * 1e6}
+
+
+def time_sync(func, number, repeat=5):
+    """Best time per call of func() over repeat runs of number calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+async def time_async(func, number, repeat=5):
+    """Best time per call of await func() over repeat runs of number calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def players(count):
+    return [FakeUser() for _ in range(count)]
+
+
+def text_channel():
+    return FakeTextChannel(FakeGuild())
+
+
+def voice_channel(channel):
+    return FakeVoiceChannel(channel.guild)
+
+
+def message(author, channel, content):
+    return FakeMessage(author, channel, content)
+
+
+def write_question_bank(size, topics=20):
+    """Write a generated question bank of size questions and return its path."""
+    path = os.path.join(tempfile.mkdtemp(prefix='sgb-bench-'), f"questions_{size}.jsonl")
+    with open(path, 'w', encoding='utf-8') as f:
+        for index in range(size):
+            record = {
+                'topic': f"topic{index % topics}",
+                'question': f"Question number {index}, what is the answer?",
+                'answer': f"Answer {index} of the bank",
+            }
+            f.write(json.dumps(record) + "\n")
+    return path
+
+
+def playlist(size):
+    """Generated (track ID, name, artists) rows."""
+    return [
+        (f"track{index}", f"Song title {index} (Remastered 2011) - Live", [f"Artist {index % 997}", f"Featured {index % 13}"])
+        for index in range(size)
+    ]
+
@@ -0,0 +1,92 @@
+"""
+Runs every benchmark of the suite and writes the results as JSON, optionally
+comparing them with the results of an earlier run.
+
+Run from the repository root:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --compare baseline.json
+"""
+import sys
+import json
+import asyncio
+import platform
+import argparse
+import subprocess
+
+from benchmarks import bench_answer_matching, bench_trivia, bench_guess_the_song, bench_threeman, bench_leaderboard
+
+
+SUITE = [bench_answer_matching, bench_trivia, bench_guess_the_song, bench_threeman, bench_leaderboard]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_suite(quick, only):
+    results = []
+    for module in SUITE:
+        if only and not any(name in module.__name__ for name in only):
+            continue
+        for entry in await module.collect(quick=quick):
+            print(f"{entry['name']:<60}{entry['us_per_op']:>14.3f} us", file=sys.stderr)
+            results.append(entry)
+    return results
+
+
+def compare(baseline, results, threshold):
+    """Print the change of every benchmark against a baseline run; return the names of the regressions."""
+    before = {entry['name']: entry['us_per_op'] for entry in baseline['results']}
+    regressions = []
+    print(f"{'benchmark':<60}{'before (us)':>14}{'after (us)':>14}{'change':>10}")
+    for entry in results:
+        name, after = entry['name'], entry['us_per_op']
+        if name not in before:
+            print(f"{name:<60}{'-':>14}{after:>14.3f}{'new':>10}")
+            continue
+        change = after / before[name] - 1 if before[name] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<60}{before[name]:>14.3f}{after:>14.3f}{change:>+10.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hot path benchmarks.")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare with")
+    parser.add_argument('--threshold', type=float, default=0.10, help="slowdown counted as a regression (default 10%%)")
+    parser.add_argument('--quick', action='store_true', help="skip the largest sizes")
+    parser.add_argument('--only', nargs='*', help="only run benchmark modules whose name contains one of these")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(args.quick, args.only))
+    report = {
+        'commit': current_commit(),
+        'python': platform.python_version(),
+        'quick': args.quick,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
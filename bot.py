@@ -1,52 +1,241 @@
 import os
+import time
+import asyncio
 from typing import List
 
+# Time every import below for the startup report printed once the bot is ready
+from games.startup import IMPORT_TIMER
+IMPORT_TIMER.install()
+
 import discord
 from discord.ext import commands
 from discord import app_commands
 from dotenv import load_dotenv
-import asyncio
-
-from games import threeman
-from games.trivia.trivia import TriviaGame
-from games.trivia.topics import TRIVIA_TOPICS
-from games.guess_the_song.guess_the_song import GuessTheSongGame
 
+# Before the game modules, which read their settings from the environment when imported
 load_dotenv()
 
+from games.registry import GameRegistry
+from games.loop_lag import LoopLagMonitor
+from games.metrics import METRICS, MetricsServer, MetricsLogger
+from games.stats import STATS, TOTAL_TOPIC, guild_id_of
+from games.snapshots import SNAPSHOTS
+from games.match_pool import MATCH_POOL
+from games.guess_the_song.voice_pool import VOICE_POOL
+from games.plugins import GAME_PLUGINS, game_class
+from games.command_sync import COMMAND_SYNC
+from games.trivia.topics import TRIVIA_TOPICS
+from games.guess_the_song.spotify_client import parse_source
+
 TOKEN = os.getenv('DISCORD_APPLICATION_TOKEN')
-GAMES_CHANNEL_ID = int(os.getenv('GAMES_CHANNEL_ID'))
-GAMES_VOICE_CHANNEL_ID = int(os.getenv('GAMES_VOICE_CHANNEL_ID'))
+# Optional comma separated allow-list of channels games may run in; empty means any channel
+GAMES_CHANNEL_IDS = {
+    int(channel_id) for channel_id in os.getenv('GAMES_CHANNEL_IDS', os.getenv('GAMES_CHANNEL_ID', '')).split(',')
+    if channel_id.strip()
+}
+# Voice channel Guess the Song plays in when the command names none and the starter is not in one; 0 for none
+GAMES_VOICE_CHANNEL_ID = int(os.getenv('GAMES_VOICE_CHANNEL_ID', '0'))
+# Serve Prometheus-style metrics on this local port when set
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+# Print every metric as one JSON log line this often; 0 turns the log line off
+METRICS_LOG_SECONDS = int(os.getenv('METRICS_LOG_SECONDS', '300'))
+# When set, commands are synced to this guild only, where changes show up at once
+DEV_GUILD_ID = int(os.getenv('DEV_GUILD_ID', '0'))
+# Run sharded: a shard count, or 'auto' for the count Discord recommends. Several processes
+# can split the shards with SHARD_IDS (comma separated), which needs a numeric SHARD_COUNT,
+# and share games through SGB_STATE_BACKEND=sqlite
+SHARD_COUNT = os.getenv('SHARD_COUNT', '')
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv('SHARD_IDS', '').split(',') if shard_id.strip()]
+if SHARD_IDS and not SHARD_COUNT.isdigit():
+    raise ValueError(f"SHARD_IDS needs SHARD_COUNT set to the total number of shards, not {SHARD_COUNT!r}")
+if SHARD_COUNT and SHARD_COUNT != 'auto' and not SHARD_COUNT.isdigit():
+    raise ValueError(f"SHARD_COUNT must be a number of shards or 'auto', not {SHARD_COUNT!r}")
+if any(shard_id >= int(SHARD_COUNT) for shard_id in SHARD_IDS):
+    raise ValueError(f"SHARD_IDS {SHARD_IDS} must all be below SHARD_COUNT {SHARD_COUNT}")
+# Seconds between renewals of this process's game leases, see games.snapshots
+LEASE_RENEW_SECONDS = float(os.getenv('LEASE_RENEW_SECONDS', '15'))
 
 intents = discord.Intents.default()
 intents.messages = True
 intents.message_content = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """Command tree that times every slash command, see on_app_command_completion."""
+    async def interaction_check(self, interaction):
+        interaction.extras['started'] = time.perf_counter()
+        return True
+
+
+    async def on_error(self, interaction, error):
+        observe_command(interaction, interaction.command, 'error')
+        await super().on_error(interaction, error)
+
+
+def observe_command(interaction, command, outcome):
+    started = interaction.extras.get('started')
+    if started is not None and command is not None:
+        METRICS.observe('sgb_command_seconds', time.perf_counter() - started, command=command.name, outcome=outcome)
+
+
+if SHARD_COUNT:
+    bot = commands.AutoShardedBot(
+        command_prefix='!', intents=intents, tree_cls=InstrumentedCommandTree,
+        shard_count=None if SHARD_COUNT == 'auto' else int(SHARD_COUNT), shard_ids=SHARD_IDS or None,
+    )
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents, tree_cls=InstrumentedCommandTree)
 tree = bot.tree
 
-# Global game state
-current_game = None  # Stores the active game instance
+# Active games, one per (guild, channel), each claimed in the shared game store
+game_registry = GameRegistry(SNAPSHOTS)
+lease_task = None
+CLAIMED_ELSEWHERE = "A game in this channel is still being run by another bot process. Try again in a minute."
+
+# Reports how long the event loop stalls, e.g. when a blocking call sneaks onto it; the lag is also in the metrics
+loop_lag_monitor = LoopLagMonitor(report_every=int(os.getenv('LOOP_LAG_REPORT_SECONDS', '0')))
+
+# Metrics, read over HTTP or from the log
+metrics_server = MetricsServer(METRICS, METRICS_PORT, METRICS_HOST)
+metrics_logger = MetricsLogger(METRICS, METRICS_LOG_SECONDS)
+for game_name in GAME_PLUGINS:
+    METRICS.gauge_callback(
+        'sgb_active_games', lambda name=game_name: sum(game.name == name for game in game_registry), game=game_name
+    )
+METRICS.gauge_callback(
+    'sgb_ffmpeg_processes',
+    lambda: sum(bool(getattr(game, 'voice_client', None) and game.voice_client.is_playing()) for game in game_registry),
+    kind='playback',
+)
+METRICS.gauge_callback('sgb_voice_connections', lambda: len(VOICE_POOL))
+
+
+def is_games_channel(channel):
+    return not GAMES_CHANNEL_IDS or channel.id in GAMES_CHANNEL_IDS
+
+
+def owns_guild(guild_id):
+    """Whether a guild is on one of this process's shards; Discord sends each guild's events to one shard."""
+    if not SHARD_IDS:
+        return True
+    return (guild_id >> 22) % int(SHARD_COUNT) in SHARD_IDS
+
+
+async def renew_leases():
+    """Keep this process's games claimed, and stop the ones another process took over meanwhile."""
+    while True:
+        await asyncio.sleep(LEASE_RENEW_SECONDS)
+        try:
+            lost = await SNAPSHOTS.renew()
+        except Exception as e:
+            print(f"Error renewing game leases: {e!r}")
+            continue
+        for current_game in game_registry.drop_channels(lost):
+            print(f"Another worker took over a {current_game.name} game")
+            await current_game.stand_down()
+
+
+def game_from_snapshot(channel, snapshot):
+    """Rebuild a saved game, or return None if it can no longer be played."""
+    name = snapshot['game']
+    if name == 'threeman':
+        return game_class(name).from_snapshot(bot, channel, snapshot)
+    if name == 'trivia':
+        if snapshot['topic'] not in TRIVIA_TOPICS:
+            return None
+        return game_class(name).from_snapshot(bot, channel, snapshot, TRIVIA_TOPICS)
+    if name == 'guess_the_song':
+        voice_channel = bot.get_channel(snapshot['voice_channel_id'])
+        if not isinstance(voice_channel, discord.VoiceChannel):
+            return None
+        return game_class(name).from_snapshot(bot, channel, voice_channel, snapshot)
+    return None
+
+
+async def resume_games():
+    """Pick up the games that were running when the bot last stopped."""
+    resumed = []
+    for channel_id, snapshot in await SNAPSHOTS.load(owns_guild):
+        channel = bot.get_channel(channel_id)
+        if channel is not None and game_registry.get(channel):
+            continue  # on_ready fires again after a reconnect
+
+        try:
+            current_game = game_from_snapshot(channel, snapshot) if channel else None
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Could not restore the game in channel {channel_id}: {e!r}")
+            current_game = None
+        if current_game is None:
+            SNAPSHOTS.discard(channel_id)
+            continue
+
+        if not await game_registry.add(channel, current_game):
+            continue
+        resumed.append(current_game)
+        print(f"Resuming {current_game.name} in channel {channel_id}")
+
+    # Games resume side by side; a song game waits for its voice connection and first tracks
+    for result in await asyncio.gather(*(current_game.resume() for current_game in resumed), return_exceptions=True):
+        if isinstance(result, Exception):
+            print(f"Error resuming a game: {result!r}")
 
 
 @bot.event
 async def on_ready():
+    global lease_task
     print(f'Logged in as {bot.user.name}')
+    if IMPORT_TIMER.installed:
+        IMPORT_TIMER.uninstall()
+        print(IMPORT_TIMER.report())
+    loop_lag_monitor.start()
+    metrics_logger.start()
+    MATCH_POOL.start()
+    if lease_task is None or lease_task.done():
+        lease_task = asyncio.create_task(renew_leases())
+    if METRICS_PORT:
+        try:
+            await metrics_server.start()
+        except OSError as e:
+            print(f"Error starting the metrics server: {e}")
     try:
-        # Sync commands to Discord
-        await tree.sync()
-        print("Slash commands synced!")
+        # Sync commands to Discord, unless they are unchanged since the last sync
+        guild = None
+        if DEV_GUILD_ID:
+            guild = discord.Object(id=DEV_GUILD_ID)
+            tree.copy_global_to(guild=guild)
+        if await COMMAND_SYNC.sync(tree, guild=guild):
+            print(f"Slash commands synced{' to the dev guild' if guild else ''}!")
+        else:
+            print("Slash commands unchanged, skipped sync.")
     except Exception as e:
         print(f"Error syncing slash commands: {e}")
 
+    # Read the question bank in a worker thread now, not on the loop in the first trivia command
+    try:
+        await TRIVIA_TOPICS.load()
+    except (OSError, ValueError) as e:
+        print(f"Error loading the trivia questions: {e!r}")
+
+    await resume_games()
+
 
 @bot.event
-async def on_message(message):
-    global current_game
+async def on_app_command_completion(interaction, command):
+    observe_command(interaction, command, 'ok')
 
-    # Ensure the bot only processes messages in the games channel
-    if current_game and message.channel.id == GAMES_CHANNEL_ID and message.author != bot.user:
-        await current_game.handle_answer(message)
+
+@bot.event
+async def on_message(message):
+    # Only forward messages that can answer the game running in this channel
+    if message.author != bot.user:
+        current_game = game_registry.candidate(message)
+        if current_game:
+            # Matching runs in the worker pool; the loop only waits for the result
+            answer_key = await MATCH_POOL.match(current_game.answer_keys, message.content)
+            if answer_key is not None:
+                with METRICS.timer('sgb_handle_answer_seconds', game=current_game.name):
+                    await current_game.handle_answer(message, answer_key)
 
     # Process other commands
     await bot.process_commands(message)
@@ -83,12 +272,11 @@ async def start_threeman(
     """
     Slash command to start a game with up to 10 players.
     """
-    global current_game
-
-    if interaction.channel.id != GAMES_CHANNEL_ID:
+    if not is_games_channel(interaction.channel):
         await interaction.response.send_message("Please start the game in the games channel.", ephemeral=True)
         return
 
+    current_game = game_registry.get(interaction.channel)
     if current_game:
         await interaction.response.send_message(
             f"A game is already in progress: {current_game.name}. Please end it before starting a new one.",
@@ -105,7 +293,10 @@ async def start_threeman(
         )
         return
     
-    current_game = threeman.ThreeManGame(bot, interaction.channel, players)
+    current_game = game_class('threeman')(bot, interaction.channel, players)
+    if not await game_registry.add(interaction.channel, current_game):
+        await interaction.response.send_message(CLAIMED_ELSEWHERE, ephemeral=True)
+        return
 
     await current_game.start_game()
     await interaction.response.send_message(
@@ -115,12 +306,11 @@ async def start_threeman(
 
 @tree.command(name="roll", description="Roll the dice during the game.")
 async def roll(interaction: discord.Interaction):
-    global current_game
-
-    if interaction.channel.id != GAMES_CHANNEL_ID:
+    if not is_games_channel(interaction.channel):
         await interaction.response.send_message("Please roll the dice in the general channel.", ephemeral=True)
         return
 
+    current_game = game_registry.get(interaction.channel)
     if not current_game:
         await interaction.response.send_message("No game is currently running.", ephemeral=True)
         return
@@ -169,12 +359,11 @@ async def start_trivia(
     """
     Slash command to start a trivia game with a specific topic.
     """
-    global current_game
-
-    if interaction.channel.id != GAMES_CHANNEL_ID:
+    if not is_games_channel(interaction.channel):
         await interaction.response.send_message("Please start the game in the games channel.", ephemeral=True)
         return
 
+    current_game = game_registry.get(interaction.channel)
     if current_game:
         await interaction.response.send_message(
             f"A game is already in progress: {current_game}. Please end it before starting a new one.",
@@ -191,14 +380,18 @@ async def start_trivia(
         )
         return
 
+    await TRIVIA_TOPICS.load()
     if topic not in TRIVIA_TOPICS:
         await interaction.response.send_message(
-            f"Unknown topic: {topic}. Available topics are: {', '.join(TRIVIA_TOPICS.keys())}.", ephemeral=True
+            f"Unknown topic: {topic}. Available topics are: {', '.join(TRIVIA_TOPICS.topics())}.", ephemeral=True
         )
         return
 
-    questions = TRIVIA_TOPICS[topic]
-    current_game = TriviaGame(bot, interaction.channel, players, topic, questions)
+    deck = TRIVIA_TOPICS.deck(topic)
+    current_game = game_class('trivia')(bot, interaction.channel, players, topic, deck)
+    if not await game_registry.add(interaction.channel, current_game):
+        await interaction.response.send_message(CLAIMED_ELSEWHERE, ephemeral=True)
+        return
     await interaction.response.send_message(
         f"Trivia game started with topic: {topic}! Players: {', '.join([player.mention for player in players])}"
     )
@@ -207,47 +400,45 @@ async def start_trivia(
 
 @tree.command(name="idk", description="Reveal the answer to the current question or song and move on.")
 async def idk(interaction: discord.Interaction):
-    global current_game
+    # Ensure the command is used in the correct channel
+    if not is_games_channel(interaction.channel):
+        await interaction.response.send_message("Please use this command in the games channel.", ephemeral=True)
+        return
 
     # Ensure a game is currently running
+    current_game = game_registry.get(interaction.channel)
     if not current_game:
         await interaction.response.send_message("No game is currently running.", ephemeral=True)
         return
 
-    # Ensure the command is used in the correct channel
-    if interaction.channel.id != GAMES_CHANNEL_ID:
-        await interaction.response.send_message("Please use this command in the games channel.", ephemeral=True)
+    if current_game.name not in ('trivia', 'guess_the_song'):
+        await interaction.response.send_message("This command can only be used during specific games.", ephemeral=True)
         return
 
-    # Check for active trivia game
-    if isinstance(current_game, TriviaGame):
-        if current_game.current_question:
-            answer = current_game.current_question['answer']
-            await interaction.response.send_message(f"Nobody knew the answer! The correct answer was: **{answer}**. Moving on...")
-            await asyncio.sleep(4)
-            await current_game.ask_question()
-        else:
-            await interaction.response.send_message("No active question to skip.", ephemeral=True)
+    if not current_game.question_active:
+        await interaction.response.send_message("No active question to skip.", ephemeral=True)
         return
 
-    # Check for active guess the song game
-    if isinstance(current_game, GuessTheSongGame):
-        await interaction.response.send_message("Revealing the current song and artists...")
-        await current_game.reveal_answer()
+    # The game reveals the answer and queues the next round itself, under its lock
+    if current_game.name == 'trivia':
+        await interaction.response.send_message("Nobody knew the answer! Moving on...")
+        await current_game.idk()
         return
 
-    # If the command is invoked in an unsupported game
-    await interaction.response.send_message("This command can only be used during specific games.", ephemeral=True)
+    if current_game.name == 'guess_the_song':
+        await interaction.response.send_message("Revealing the current song and artists...")
+        await current_game.reveal_answer()
 
 
 @tree.command(name='list_trivia_topics', description="List all available trivia topics.")
 async def list_trivia_topics(interaction: discord.Interaction):
     # Ensure the command is only usable in the correct channel
-    if interaction.channel.id != GAMES_CHANNEL_ID:
+    if not is_games_channel(interaction.channel):
         await interaction.response.send_message("Please list the trivia topics in the games channel.", ephemeral=True)
         return
 
-    topics = ", ".join(TRIVIA_TOPICS.keys())
+    await TRIVIA_TOPICS.load()
+    topics = ", ".join(TRIVIA_TOPICS.topics())
     await interaction.response.send_message(f"Available trivia topics: {topics}")
 
 ### END TRIVIA GAME COMMANDS ###
@@ -266,7 +457,9 @@ async def list_trivia_topics(interaction: discord.Interaction):
     player7="Seventh player (optional)",
     player8="Eighth player (optional)",
     player9="Ninth player (optional)",
-    player10="Tenth player (optional)"
+    player10="Tenth player (optional)",
+    sources="Spotify playlist or album links, or genre:<name>, separated by commas (optional)",
+    voice_channel="Voice channel to play in (optional, defaults to the one you are in)"
 )
 async def start_guess_the_song(
     interaction: discord.Interaction,
@@ -279,17 +472,18 @@ async def start_guess_the_song(
     player7: discord.User = None,
     player8: discord.User = None,
     player9: discord.User = None,
-    player10: discord.User = None
+    player10: discord.User = None,
+    sources: str = None,
+    voice_channel: discord.VoiceChannel = None
 ):
     """
     Slash command to start a guess the song game.
     """
-    global current_game
-
-    if interaction.channel.id != GAMES_CHANNEL_ID:
+    if not is_games_channel(interaction.channel):
         await interaction.response.send_message("Please start the game in the games channel.", ephemeral=True)
         return
 
+    current_game = game_registry.get(interaction.channel)
     if current_game:
         await interaction.response.send_message(
             f"A game is already in progress: {current_game}. Please end it before starting a new one.",
@@ -306,22 +500,37 @@ async def start_guess_the_song(
         )
         return
 
+    # Parse the playlists, albums and genres to play from
+    try:
+        song_sources = [parse_source(source) for source in sources.split(',') if source.strip()] if sources else None
+    except ValueError as e:
+        await interaction.response.send_message(f"{e}.", ephemeral=True)
+        return
+
     # Get guild and voice channel
     guild = interaction.guild
     if not guild:
         await interaction.response.send_message("Error: Could not fetch the guild (server).", ephemeral=True)
         return
 
-    voice_channel = guild.get_channel(GAMES_VOICE_CHANNEL_ID)
+    if voice_channel is None:
+        voice_state = getattr(interaction.user, 'voice', None)
+        voice_channel = voice_state.channel if voice_state else guild.get_channel(GAMES_VOICE_CHANNEL_ID)
     if not voice_channel or not isinstance(voice_channel, discord.VoiceChannel):
-        await interaction.response.send_message("Error: The configured voice channel is invalid or not found.", ephemeral=True)
+        await interaction.response.send_message(
+            "Error: Join a voice channel or pick one for the game to play in.", ephemeral=True
+        )
         return
 
     # Start the game
-    current_game = GuessTheSongGame(bot, interaction.channel, voice_channel, players)
-    await interaction.response.send_message('Starting a guess the song game in 20 seconds. Be sure to join the Curved Heads voice chat to hear the music.')
+    current_game = game_class('guess_the_song')(bot, interaction.channel, voice_channel, players, sources=song_sources)
+    if not await game_registry.add(interaction.channel, current_game):
+        await interaction.response.send_message(CLAIMED_ELSEWHERE, ephemeral=True)
+        return
+    await interaction.response.send_message(f'Starting a guess the song game in 20 seconds. Be sure to join {voice_channel.mention} to hear the music.')
 
     if not await current_game.join_voice_channel():
+        game_registry.remove(interaction.channel)
         await interaction.followup.send("Error joining the voice channel. Please try again.", ephemeral=True)
         return
 
@@ -331,26 +540,75 @@ async def start_guess_the_song(
 
 @tree.command(name="end_game", description="End the current game.")
 async def end_game(interaction: discord.Interaction):
-    global current_game
-
-    if interaction.channel.id != GAMES_CHANNEL_ID:
+    if not is_games_channel(interaction.channel):
         await interaction.response.send_message("Please end the game in the general channel.", ephemeral=True)
         return
 
+    current_game = game_registry.get(interaction.channel)
     if not current_game:
         await interaction.response.send_message("There is no game in progress.", ephemeral=True)
         return
 
+    game_registry.remove(interaction.channel)
     await current_game.end_game()
-    current_game = None
     await interaction.response.send_message("The current game has been ended.")
 
 
+@tree.command(name="leaderboard", description="Show the all-time leaderboard of a game in this server.")
+@app_commands.describe(
+    game="The game to show the leaderboard of.",
+    topic="Only count points from this trivia topic (optional)."
+)
+@app_commands.choices(game=[
+    app_commands.Choice(name="Trivia", value='trivia'),
+    app_commands.Choice(name="Guess the Song", value='guess_the_song'),
+])
+async def leaderboard(interaction: discord.Interaction, game: app_commands.Choice[str], topic: str = None):
+    await TRIVIA_TOPICS.load()
+    if topic and topic != "all_topics" and topic not in TRIVIA_TOPICS:
+        await interaction.response.send_message(f"Unknown topic '{topic}'.", ephemeral=True)
+        return
+
+    await interaction.response.defer()
+    rows = await STATS.leaderboard(guild_id_of(interaction.channel), game.value, topic=topic if topic and topic != "all_topics" else TOTAL_TOPIC)
+    if not rows:
+        await interaction.followup.send(f"Nobody has scored in {game.name} yet.")
+        return
+
+    leaderboard_message = "\n".join([f"{place}. <@{user_id}>: {points}" for place, (user_id, points) in enumerate(rows, 1)])
+    await interaction.followup.send(
+        f"All-time {game.name} Leaderboard:\n{leaderboard_message}",
+        allowed_mentions=discord.AllowedMentions.none(),
+    )
+
+
+@tree.command(name="stats", description="Show the all-time stats of a player in this server.")
+@app_commands.describe(player="The player to show the stats of (defaults to you).")
+async def stats(interaction: discord.Interaction, player: discord.User = None):
+    player = player or interaction.user
+    await interaction.response.defer(ephemeral=True)
+    rows = await STATS.user_stats(guild_id_of(interaction.channel), player.id)
+    if not rows:
+        await interaction.followup.send(f"{player.mention} has not played any games yet.", ephemeral=True)
+        return
+
+    lines = [
+        f"{game} ({topic}): {points} points" if topic != TOTAL_TOPIC else f"{game}: {points} points, {wins} wins in {games_played} games"
+        for game, topic, points, games_played, wins in rows
+    ]
+    await interaction.followup.send(f"Stats of {player.mention}:\n" + "\n".join(lines), ephemeral=True)
+
+
 @tree.command(name="hellosgb", description="Say hello to the bot.")
 async def hellosgb(interaction: discord.Interaction):
     await interaction.response.send_message("Hello! I am SGB!", ephemeral=True)
 
 ### END GENERAL GAME COMMANDS ###
 
-# Run the bot
-bot.run(TOKEN)
+def main():
+    bot.run(TOKEN)
+
+
+# Match pool workers import this module as __mp_main__; only the real process may log in
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+import re
+import math
+import unicodedata
+
+
+# Patterns are compiled once here; normalizing a guess must stay cheap because it runs per message
+PARENTHETICAL_PATTERN = re.compile(r"\s*[\(\[].*?[\)\]]")
+FEATURING_PATTERN = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s.*$")
+APOSTROPHE_PATTERN = re.compile(r"['’`]")
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]|_")
+LEADING_THE_PATTERN = re.compile(r"^the\s+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize(text):
+    """
+    Reduce an answer or a guess to a comparable key: no accents, lower case, no
+    parentheticals, feat. clauses, punctuation or leading "the".
+    """
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    text = text.lower().replace('&', ' and ')
+    text = PARENTHETICAL_PATTERN.sub(' ', text)
+    text = FEATURING_PATTERN.sub('', text)
+    text = APOSTROPHE_PATTERN.sub('', text)
+    text = PUNCTUATION_PATTERN.sub(' ', text)
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
+    return LEADING_THE_PATTERN.sub('', text)
+
+
+def hint_for(answer, fraction):
+    """
+    Mask an answer for a hint, showing the first part of every word (at least its
+    first letter) and hiding the other letters and digits. The last character of
+    a word is never shown, so short answers like "4" are not given away.
+    """
+    words = []
+    for word in answer.split(' '):
+        shown = min(max(1, math.floor(len(word) * fraction)), len(word) - 1)
+        words.append("".join(char if index < shown or not char.isalnum() else '_' for index, char in enumerate(word)))
+    return " ".join(words)
+
+
+def allowed_distance(key):
+    """Typos tolerated for a key; short answers and numbers must match exactly."""
+    if len(key) <= 4 or key.isdigit():
+        return 0
+    if len(key) <= 8:
+        return 1
+    return 2
+
+
+def within_distance(guess, key, max_distance):
+    """
+    Check whether the edit distance between two strings is at most max_distance.
+    Shared prefixes and suffixes are skipped and only the diagonal band that can
+    stay within the bound is filled in, so a typo costs a handful of cells.
+    """
+    if abs(len(guess) - len(key)) > max_distance:
+        return False
+    if guess == key:
+        return True
+    if max_distance == 0:
+        return False
+
+    start = 0
+    while start < len(guess) and start < len(key) and guess[start] == key[start]:
+        start += 1
+    guess_end, key_end = len(guess), len(key)
+    while guess_end > start and key_end > start and guess[guess_end - 1] == key[key_end - 1]:
+        guess_end -= 1
+        key_end -= 1
+    guess, key = guess[start:guess_end], key[start:key_end]
+    if not guess or not key:
+        return max(len(guess), len(key)) <= max_distance
+
+    limit = max_distance + 1
+    previous = [min(j, limit) for j in range(len(key) + 1)]
+    for i, guess_char in enumerate(guess, 1):
+        current = [limit] * (len(key) + 1)
+        current[0] = min(i, limit)
+        row_min = current[0]
+        for j in range(max(1, i - max_distance), min(len(key), i + max_distance) + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (guess_char != key[j - 1]), limit)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return False
+        previous = current
+
+    return previous[-1] <= max_distance
+
+
+class AnswerKey:
+    """
+    The accepted forms of one answer, normalized once when the question is asked
+    so that checking a guess is a set lookup plus a bounded edit distance.
+    """
+    __slots__ = ('answer', 'keys')
+
+    def __init__(self, answer, aliases=()):
+        self.answer = answer
+        self.keys = {}
+        for text in (answer, *aliases):
+            key = normalize(text)
+            if key:
+                self.keys[key] = allowed_distance(key)
+
+
+    def matches(self, guess):
+        """Check an already normalized guess against every accepted form."""
+        if guess in self.keys:
+            return True
+        for key, max_distance in self.keys.items():
+            if max_distance and within_distance(guess, key, max_distance):
+                return True
+        return False
+
+
+    def __repr__(self):
+        return f"AnswerKey({self.answer!r})"
+
+
+def find_match(answer_keys, guess):
+    """Return the first answer key matched by a normalized guess, or None."""
+    for answer_key in answer_keys:
+        if answer_key.matches(guess):
+            return answer_key
+    return None
+
+
+def match_batch(groups):
+    """
+    Match many raw guesses at once, e.g. in a worker process. Every group is
+    (answer keys, guesses); the result holds, per group, the index of the key
+    each guess matched or None.
+    """
+    results = []
+    for answer_keys, guesses in groups:
+        indexes = []
+        for guess in guesses:
+            guess = normalize(guess)
+            indexes.append(next((index for index, answer_key in enumerate(answer_keys) if answer_key.matches(guess)), None))
+        results.append(indexes)
+    return results
@@ -0,0 +1,73 @@
+import os
+import json
+import hashlib
+
+from games.executor import run_blocking
+
+
+# Hash of the command tree last pushed to Discord, per scope
+COMMAND_SYNC_PATH = os.getenv('SGB_COMMAND_SYNC_PATH', os.path.join('data', 'command_sync.json'))
+
+
+def command_payload(tree, command):
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        # discord.py before 2.4 builds the payload without the tree
+        return command.to_dict()
+
+
+def tree_hash(tree, guild=None):
+    """Hash of the payload Discord would receive for the commands of a scope."""
+    payload = sorted(
+        (command_payload(tree, command) for command in tree.get_commands(guild=guild)),
+        key=lambda command: command['name'],
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CommandSyncCache:
+    """
+    Remembers the hash of the command tree last synced to each scope (global or
+    one guild), in memory and on disk. The sync, which counts against a strict
+    rate limit, is skipped when the tree has not changed since then, e.g. on a
+    gateway reconnect or a restart without command changes.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.hashes = None
+
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        partial_path = f"{self.path}.part"
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump(self.hashes, f)
+        os.replace(partial_path, self.path)
+
+
+    async def sync(self, tree, guild=None):
+        """Sync the commands of a scope if they changed. Returns whether a sync was made."""
+        if self.hashes is None:
+            self.hashes = await run_blocking(self._load)
+
+        scope = str(guild.id) if guild else 'global'
+        current = tree_hash(tree, guild)
+        if self.hashes.get(scope) == current:
+            return False
+
+        await tree.sync(guild=guild)
+        self.hashes[scope] = current
+        await run_blocking(self._save)
+        return True
+
+
+COMMAND_SYNC = CommandSyncCache(COMMAND_SYNC_PATH)
@@ -0,0 +1,21 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Spotify and yt-dlp calls are network bound, so a small thread pool keeps them off the event loop
+BLOCKING_WORKERS = int(os.getenv('BLOCKING_WORKERS', '4'))
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix='blocking')
+
+
+async def run_blocking(func, *args, timeout=None, **kwargs):
+    """
+    Run a blocking call in the shared thread pool and wait for it for at most
+    timeout seconds. Raises asyncio.TimeoutError when the call takes too long;
+    the worker thread then finishes on its own and its result is discarded.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+    return await asyncio.wait_for(future, timeout)
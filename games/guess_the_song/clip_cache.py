@@ -0,0 +1,101 @@
+import os
+import asyncio
+
+from games.executor import run_blocking
+from games.metrics import METRICS
+
+
+class ClipCache:
+    """
+    Short Opus excerpts of songs stored on disk, one Ogg file per Spotify track.
+    Clips are encoded once with ffmpeg and then played back without re-encoding.
+    The least recently played clips are deleted once the directory grows past
+    max_bytes.
+    """
+    def __init__(self, directory, max_bytes, clip_seconds=90, bitrate='96k'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.clip_seconds = clip_seconds
+        self.bitrate = bitrate
+
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+
+    def path_for(self, track_id):
+        return os.path.join(self.directory, f"{track_id}.ogg")
+
+
+    def get(self, track_id):
+        """Return the path of a cached clip, marking it as recently used, or None."""
+        if not self.enabled or not track_id:
+            return None
+        path = self.path_for(track_id)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+
+    async def create(self, track_id, stream_url):
+        """Encode a clip of a stream into the cache. Returns the clip path, or None on failure."""
+        if not self.enabled or not track_id:
+            return None
+
+        path = self.path_for(track_id)
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(self.directory, exist_ok=True)
+        partial_path = f"{path}.part"
+        process = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-nostdin', '-loglevel', 'error', '-y',
+            '-reconnect', '1', '-reconnect_streamed', '1', '-reconnect_delay_max', '5',
+            '-i', stream_url, '-t', str(self.clip_seconds),
+            '-vn', '-c:a', 'libopus', '-b:a', self.bitrate, '-ar', '48000', '-ac', '2',
+            '-f', 'ogg', partial_path,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        METRICS.adjust('sgb_ffmpeg_processes', 1, kind='clip')
+        try:
+            _, stderr = await process.communicate()
+        finally:
+            METRICS.adjust('sgb_ffmpeg_processes', -1, kind='clip')
+            if process.returncode is None:
+                # Cancelled half way, e.g. by a timeout or the game ending
+                process.kill()
+                await process.wait()
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+
+        if process.returncode != 0:
+            print(f"Could not cache clip for {track_id}: {stderr.decode(errors='replace').strip()}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return None
+
+        os.replace(partial_path, path)
+        await run_blocking(self._evict)
+        return path
+
+
+    def _evict(self):
+        clips = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.ogg'):
+                stat = entry.stat()
+                clips.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in clips)
+        for _, size, path in sorted(clips):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -1,60 +1,114 @@
 import os
-import re
 import json
-import random
 
 import asyncio
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-import yt_dlp
-from discord import FFmpegPCMAudio
-
-
-SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
-SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
+from discord import FFmpegPCMAudio, FFmpegOpusAudio
+
+from games.answer_matching import normalize, find_match, hint_for
+from games.executor import run_blocking
+from games.outbox import channel_outbox
+from games.scheduler import WHEEL
+from games.stats import STATS, guild_id_of
+from games.snapshots import SNAPSHOTS
+from games.metrics import METRICS, TimedLock
+from games.guess_the_song.prefetch import SongPrefetcher
+from games.guess_the_song.resolution_cache import ResolutionCache
+from games.guess_the_song.clip_cache import ClipCache
+from games.guess_the_song.spotify_client import PlaylistCache, iter_source_pages
+from games.guess_the_song.track_table import Track, TrackTable
+from games.guess_the_song.voice_pool import VOICE_POOL
+
+
+# Played when a game is started without any playlists, albums or genres
+GAME_PLAYLIST_ID = '0R1oMVYDw6vfSaCrRjUvLJ'
+
+# Seconds to wait for one page of Spotify tracks and for one YouTube lookup
+SPOTIFY_TIMEOUT = 60
+YOUTUBE_TIMEOUT = 30
+
+# Song lookups and other Guess the Song data are cached on disk here
+CACHE_DIR = os.getenv('SGB_CACHE_DIR', '.cache')
+
+# Spotify track ID -> YouTube video, shared by every game so repeat plays skip the search
+RESOLUTION_CACHE = ResolutionCache(
+    os.path.join(CACHE_DIR, 'song_resolutions.sqlite3'),
+    max_entries=int(os.getenv('SONG_RESOLUTION_CACHE_SIZE', '5000')),
+)
+
+# Playlist copies reused while their Spotify snapshot_id is unchanged
+PLAYLIST_CACHE = PlaylistCache(os.path.join(CACHE_DIR, 'playlists'))
+
+# Pre-encoded Opus clips played without transcoding; set SONG_CLIP_CACHE_MB=0 to always stream
+CLIP_CACHE = ClipCache(
+    os.path.join(CACHE_DIR, 'clips'),
+    max_bytes=int(os.getenv('SONG_CLIP_CACHE_MB', '256')) * 1024 * 1024,
+    clip_seconds=int(os.getenv('SONG_CLIP_SECONDS', '90')),
+)
+CLIP_TIMEOUT = 60
+
+# How many upcoming songs are kept resolved ahead of the current round
+PREFETCH_DEPTH = int(os.getenv('SONG_PREFETCH_DEPTH', '2'))
 
 
 class GuessTheSongGame:
-    def __init__(self, bot, text_channel, voice_channel, players):
+    name = 'guess_the_song'
+    # Pauses in seconds, each can be overridden per game
+    DEFAULT_DELAYS = {
+        'between_songs': 5,
+        'after_leaderboard': 10,
+        'answer_time': 60,  # Before an unguessed song is revealed
+    }
+    # Fractions of the answer time after which a hint about the title is given
+    HINT_STAGES = (0.5, 0.75)
+    # Unguessed songs in a row after which the game ends itself and leaves voice
+    MAX_IDLE_ROUNDS = 3
+
+    def __init__(self, bot, text_channel, voice_channel, players, sources=None, prefetch_depth=PREFETCH_DEPTH, delays=None):
         self.bot = bot
         self.text_channel = text_channel
+        self.outbox = channel_outbox(text_channel)  # Messages queued together are sent as one
         self.voice_channel = voice_channel
-        self.players = players
+        self.player_ids = {player.id for player in players}
         self.current_song = None
         self.current_artists = []
+        self.song_key = None
+        self.answer_keys = []  # AnswerKeys still worth scoring this round
         self.current_song_url = None
-        self.current_playlist = None
-        self.scores = {player: 0 for player in players}
+        self.current_track = None
+        self.sources = sources or [('playlist', GAME_PLAYLIST_ID)]  # (kind, value) pairs, see parse_source
+        self.track_table = None
+        self.tracks_loaded = asyncio.Event()  # Set once the first page of tracks is in the table
+        self.ingest_task = None
+        self.scores = {player.id: 0 for player in players}
+        self.guild_id = guild_id_of(text_channel)
         self.question_counter = 0
         self.question_active = False
-        self.lock = asyncio.Lock()
-        self.spotify = None
+        self.lock = TimedLock(self.name)
         self.voice_client = None
         self.song_guessed = False
         self.guessed_artists_correct = []
         self.artists_guessed = False
+        self.finished = False
+        self.pending_calls = set()  # Blocking calls in flight, cancelled when the game ends
+        self.prefetch_depth = prefetch_depth
+        self.prefetcher = None
+        self.delays = {**self.DEFAULT_DELAYS, **(delays or {})}
+        self.round_timer = None  # Pending hint, timeout or round transition on the timer wheel
+        self.hint_stage = 0
+        self.idle_rounds = 0
+
+
+    def _get_youtube_url_from_song(self, track_id, song, artists):
+        # Reuse the cached stream URL while it is still valid
+        cached = RESOLUTION_CACHE.get(track_id) if track_id else None
+        if cached:
+            stream_url = RESOLUTION_CACHE.fresh_stream_url(cached)
+            if stream_url:
+                return stream_url
+
+        # yt_dlp takes a while to import; this runs on a worker thread, away from the event loop
+        import yt_dlp
 
-
-    def _initialize_spotify(self):
-        """Initialize the Spotify client."""
-        client_credentials_manager = SpotifyClientCredentials(client_id=SPOTIFY_CLIENT_ID, client_secret=SPOTIFY_CLIENT_SECRET)
-        self.spotify = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
-
-
-    def _get_game_playlist(self):
-        """Get a playlist of songs for the game."""
-        tracks = []
-        response = self.spotify.user_playlist_tracks('spotify', '0R1oMVYDw6vfSaCrRjUvLJ')
-        tracks.extend(response['items'])
-
-        while response['next']:
-            response = self.spotify.next(response)
-            tracks.extend(response['items'])
-
-        return tracks
-
-
-    def _get_youtube_url_from_song(self, song, artists):
         query = f"{song} {' '.join(artists)} lyrics"
         ydl_opts = {
             'format': 'best',
@@ -64,188 +118,394 @@ class GuessTheSongGame:
 
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                response = ydl.extract_info(f"ytsearch:{query}", download=False)
-                return response['entries'][0]['url']
+                video = None
+                if cached:
+                    # Refresh the stream URL of the known video instead of searching again
+                    try:
+                        video = ydl.extract_info(f"https://www.youtube.com/watch?v={cached['video_id']}", download=False)
+                    except yt_dlp.utils.DownloadError:
+                        RESOLUTION_CACHE.discard(track_id)
+                if video is None:
+                    video = ydl.extract_info(f"ytsearch:{query}", download=False)['entries'][0]
         except yt_dlp.utils.DownloadError as e:
             raise NotImplementedError("Error fetching YouTube URL.") from e
 
+        if track_id:
+            RESOLUTION_CACHE.put(track_id, video['id'], video.get('duration'), video['url'])
+        return video['url']
+
+
+    async def _run_blocking(self, func, *args, timeout):
+        """
+        Run a blocking Spotify/yt-dlp call in the shared thread pool. The wait is
+        cancelled as soon as the game ends.
+        """
+        task = asyncio.ensure_future(run_blocking(func, *args, timeout=timeout))
+        self.pending_calls.add(task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if not self.finished:
+                raise
+            return None
+        finally:
+            self.pending_calls.discard(task)
+
 
     async def join_voice_channel(self):
+        """Take the voice connection of the guild, reconnecting it if it dropped."""
         try:
-            self.voice_client = await self.voice_channel.connect()
-            return True
+            self.voice_client = await VOICE_POOL.acquire(self.voice_channel, self)
         except Exception as e:
             print(e)
-            await self.text_channel.send(f"Error joining voice channel")
+            self.outbox.send(f"Error joining voice channel")
             return False
+        if self.voice_client is None:
+            self.outbox.send("Another guess the song game is already playing in this server.")
+            return False
+        return True
 
 
     async def leave_voice_channel(self):
-        await self.voice_client.disconnect()
+        if not self.voice_client:
+            return
+        await VOICE_POOL.release(self.voice_channel.guild.id, self)
         self.voice_client = None
 
 
     async def play_song(self):
         if not self.voice_client or not self.voice_client.is_connected():
-            await self.text_channel.send("Error: Not connected to a voice channel.")
+            self.outbox.send("Error: Not connected to a voice channel.")
             return
         
         if not self.current_song_url:
-            await self.text_channel.send("Error: No song URL found.")
+            self.outbox.send("Error: No song URL found.")
             return
         
+        self.voice_client.play(self._audio_source())
+
+        self.outbox.send(f"Song now playing! Guess the song!")
+
+
+    def _audio_source(self):
+        """Build the ffmpeg audio source of the current song."""
+        clip_path = CLIP_CACHE.get(self.current_track.track_id)
+        if clip_path:
+            # The clip is already Opus, so it is passed through without re-encoding
+            return FFmpegOpusAudio(clip_path, codec='copy')
+
         ffmpeg_options = {
             'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
             'options': '-vn',
         }
-
-        source = FFmpegPCMAudio(self.current_song_url, **ffmpeg_options)
-        self.voice_client.play(source)
-
-        await self.text_channel.send(f"Song now playing! Guess the song!")
+        return FFmpegPCMAudio(self.current_song_url, **ffmpeg_options)
 
 
     async def stop_song(self):
         if not self.voice_client or not self.voice_client.is_connected():
-            await self.text_channel.send("Error: Not connected to a voice channel.")
+            self.outbox.send("Error: Not connected to a voice channel.")
             return
         
         self.voice_client.stop()
 
 
+    def to_snapshot(self):
+        """
+        The state of the game between songs, with players as user IDs. A song
+        still playing is not kept; a new one is picked after a restart.
+        """
+        return {
+            'game': self.name,
+            'voice_channel_id': self.voice_channel.id,
+            'sources': [list(source) for source in self.sources],
+            'scores': [[user_id, score] for user_id, score in self.scores.items()],
+            'question_counter': self.question_counter - (1 if self.question_active else 0),
+            'idle_rounds': self.idle_rounds,
+        }
+
+
+    @classmethod
+    def from_snapshot(cls, bot, text_channel, voice_channel, snapshot):
+        game = cls(bot, text_channel, voice_channel, [], sources=[tuple(source) for source in snapshot['sources']])
+        game.scores = {user_id: score for user_id, score in snapshot['scores']}
+        game.player_ids = set(game.scores)
+        game.question_counter = snapshot['question_counter']
+        game.idle_rounds = snapshot['idle_rounds']
+        return game
+
+
+    def save_snapshot(self):
+        SNAPSHOTS.save(self.text_channel.id, self.to_snapshot())
+
+
+    async def resume(self):
+        """Carry on after a restart from the last snapshot."""
+        self.outbox.send("Resuming the guess the song game after a restart.")
+        if not await self.join_voice_channel():
+            await self.end_game()
+            return
+        await self.start_game()
+
+
     async def start_game(self):
-        # Initialize the Spotify client, if possible
-        try:
-            self._initialize_spotify()
-        except Exception as e:
-            print(e)
-            await self.text_channel.send(f"Error initializing Spotify/YouTube client, contact an administrator.")
+        self.save_snapshot()
+
+        # Load the sources in the background; the first round only waits for the first page
+        self.track_table = TrackTable()
+        self.ingest_task = asyncio.create_task(self._ingest_sources())
+        await self.tracks_loaded.wait()
+
+        if self.finished:
+            return
+
+        if not self.track_table:
+            self.outbox.send(f"Error initializing Spotify/YouTube client, contact an administrator.")
             await self.end_game()
             return
-        
-        # Get the game playlist
-        self.current_playlist = self._get_game_playlist()
 
-        # await asyncio.sleep(20)
+        # Start resolving upcoming songs in the background
+        self.prefetcher = SongPrefetcher(self._pick_song, self._resolve_song, depth=self.prefetch_depth)
+        self.prefetcher.start()
+
         await self.ask_song()
 
 
+    @staticmethod
+    def _next_page(pages):
+        """Fetch the next page of a source as Track records, or None once the source is exhausted."""
+        page = next(pages, None)
+        if page is None:
+            return None
+        return [Track(track_id, name, artists) for track_id, name, artists in page]
+
+
+    async def _ingest_sources(self):
+        """Stream every source into the track table page by page while the game is running."""
+        try:
+            for source in self.sources:
+                pages = iter_source_pages(source, PLAYLIST_CACHE)
+                while not self.finished:
+                    try:
+                        with METRICS.timer('sgb_external_call_seconds', service='spotify'):
+                            tracks = await self._run_blocking(self._next_page, pages, timeout=SPOTIFY_TIMEOUT)
+                    except Exception as e:
+                        print(f"Could not load {source}: {e!r}")
+                        break
+                    if tracks is None:
+                        break
+
+                    self.track_table.add(tracks)
+                    if self.track_table:
+                        self.tracks_loaded.set()
+        finally:
+            self.tracks_loaded.set()
+
+
+    def _pick_song(self):
+        """Pick the next track of the shuffled playlist for the prefetcher."""
+        return self.track_table.draw()
+
+
+    async def _resolve_song(self, track):
+        with METRICS.timer('sgb_external_call_seconds', service='youtube'):
+            url = await self._run_blocking(
+                self._get_youtube_url_from_song, track.track_id, track.name, track.artists, timeout=YOUTUBE_TIMEOUT
+            )
+
+        # Encode a clip in the background; the song is queued at once and streams until the clip is ready
+        if url and CLIP_CACHE.enabled and not CLIP_CACHE.get(track.track_id):
+            task = asyncio.ensure_future(self._cache_clip(track.track_id, url))
+            self.pending_calls.add(task)
+            task.add_done_callback(self.pending_calls.discard)
+
+        return url
+
+
+    async def _cache_clip(self, track_id, url):
+        try:
+            await asyncio.wait_for(CLIP_CACHE.create(track_id, url), CLIP_TIMEOUT)
+        except (asyncio.TimeoutError, OSError) as e:
+            print(f"Could not cache clip for {track_id}: {e!r}")
+
+
     async def ask_song(self):
-        # Check if there is a current playlist
-        if not self.current_playlist:
-            await self.text_channel.send("Error: No playlist found.")
+        # A game that cannot play another song ends, which frees its voice connection and channel
+        if not self.track_table:
+            self.outbox.send("Error: No playlist found.")
+            await self.end_game()
             return
 
-        tracks = self.current_playlist
-
-        songs_and_artists = {}
-        for track in tracks:
-            songs_and_artists[track['track']['name']] = [artist['name'] for artist in track['track']['artists']]
-        
-        song = random.choice(list(songs_and_artists.keys()))
-        artists = songs_and_artists[song]
-        self.current_song = song
+        # The prefetcher has usually resolved this song while the previous round was playing
+        next_song = await self.prefetcher.get()
+        if self.finished:
+            return
 
-        try:
-            self.current_song_url = self._get_youtube_url_from_song(song, artists)
-        except NotImplementedError as e:
-            await self.text_channel.send("Unfortunately YouTube is very aggressive with their anti-bot campaign. Please ask the bot administrator to be able to play. The game must be locally hosted.")
+        if next_song is None:
+            self.outbox.send("Unfortunately YouTube is very aggressive with their anti-bot campaign. Please ask the bot administrator to be able to play. The game must be locally hosted.")
+            await self.end_game()
             return
 
-        self.current_artists = artists
+        self.current_track, self.current_song_url = next_song
+        self.current_song = self.current_track.name
+        self.current_artists = list(self.current_track.artists)
+        self.song_key = self.current_track.title_key
 
         if self.voice_client and self.voice_client.is_connected():
             await self.play_song()
+        elif await self.join_voice_channel():
+            # The connection dropped between songs and was replaced
+            await self.play_song()
         else:
-            await self.text_channel.send("Error: Not connected to a voice channel.")
+            await self.end_game()
             return
 
         self.question_counter += 1
+        self.answer_keys = [self.song_key, *self.current_track.artist_keys]
         self.question_active = True
 
+        # Start the clock for hints and the reveal
+        self.hint_stage = 0
+        self._schedule_round_deadline()
+
 
-    async def handle_answer(self, message):
+    async def handle_answer(self, message, answer_key=None):
         """
-        Checks if a user's message matches the correct answer.
+        Checks if a user's message matches the correct answer. answer_key is the
+        key the message was already matched to, e.g. by the match pool.
         """
         async with self.lock:
             if not self.current_song or not self.question_active:
                 return
-            
-            correct_song = self.current_song.lower()
-            correct_artists = [artist.lower() for artist in self.current_artists]
 
             # Check if the message content matches the correct song or artist until all answers are found
-            user_guess = message.content.lower()
             user = message.author
-
-            def strip_parentheses(text):
-                return re.sub(r"\s*\(.*?\)", "", text).strip()
-
-            correct_song = strip_parentheses(self.current_song.lower())
+            if user.id not in self.player_ids:
+                return
+            matched = answer_key or find_match(self.answer_keys, normalize(message.content))
+            # A key matched before the lock was taken only counts if nobody has guessed it since
+            if matched is None or matched not in self.answer_keys:
+                return
+            self.answer_keys.remove(matched)  # Each answer only scores once
+            self.idle_rounds = 0
 
             # Case when the user guesses the song
-            if not self.song_guessed and user_guess == correct_song:
+            if matched is self.song_key:
                 self.song_guessed = True
-                self.scores[user] += 1
-                await self.text_channel.send(f"{user.mention} guessed the song, {correct_song}!")
+                self.scores[user.id] += 1
+                STATS.record_point(self.guild_id, self.name, user.id)
+                self.save_snapshot()
+                self.outbox.send(f"{user.mention} guessed the song, {self.current_song}!")
 
             # Case when the user guesses an artist
-            if not self.artists_guessed and user_guess in correct_artists:
+            else:
                 # Add the artist to the list of correct artists guessed
-                self.guessed_artists_correct.append(user_guess)
+                self.guessed_artists_correct.append(matched.answer)
                 # Check if all artists have been guessed
                 if len(self.guessed_artists_correct) == len(self.current_artists):
                     self.artists_guessed = True
                 # Update the user's score for correct guess
-                self.scores[user] += 1
-                await self.text_channel.send(f"{user.mention} guessed an artist, {user_guess}!")
-                # Remove the correct artist from the list of correct artists
-                correct_artists.remove(user_guess)
+                self.scores[user.id] += 1
+                STATS.record_point(self.guild_id, self.name, user.id)
+                self.save_snapshot()
+                self.outbox.send(f"{user.mention} guessed an artist, {matched.answer}!")
 
             # Case when both the song and all artists have been guessed
             if self.song_guessed and self.artists_guessed:
-                await self.text_channel.send(f"All artists and the song have been guessed! Correct song: {self.current_song} by {', '.join(self.guessed_artists_correct)}")
+                self.outbox.send(f"All artists and the song have been guessed! Correct song: {self.current_song} by {', '.join(self.guessed_artists_correct)}")
                 await self.stop_song()
                 self.question_active = False
+                self.answer_keys = []
                 self.song_guessed = False
                 self.artists_guessed = False
                 self.guessed_artists_correct = []
-
-                # Check if there have been 5 questions asked
-                if self.question_counter % 5 == 0:
-                    await self.display_leaderboard()
-                    await asyncio.sleep(5)
-
-                await asyncio.sleep(5)
-                await self.text_channel.send("Next song starting now!")
-                await self.ask_song()
+                self.save_snapshot()
+                await self._schedule_next_song()
 
 
     async def reveal_answer(self):
         """
         Reveals the current song because nobody guessed it/'idk' was ran
         """
-        if not self.current_song or not self.question_active:
-            await self.text_channel.send("Error: No question active.")
-            return
-        
+        async with self.lock:
+            if not self.current_song or not self.question_active:
+                self.outbox.send("Error: No question active.")
+                return
+
+            self.idle_rounds = 0
+            await self._reveal("The correct song was")
+
+
+    async def _reveal(self, intro):
         correct_artists = ', '.join(self.current_artists)
-        await self.text_channel.send(f"The correct song was: {self.current_song} by {correct_artists}")
+        self.outbox.send(f"{intro}: {self.current_song} by {correct_artists}")
         await self.stop_song()
 
         self.question_active = False
+        self.answer_keys = []
         self.song_guessed = False
         self.artists_guessed = False
         self.guessed_artists_correct = []
+        self.save_snapshot()
+        await self._schedule_next_song()
 
-        # Check if there have been 5 questions asked
+
+    async def _schedule_next_song(self):
+        """Queue the next round on the shared timer wheel, showing the leaderboard every 5 songs."""
+        delay = self.delays['between_songs']
         if self.question_counter % 5 == 0:
             await self.display_leaderboard()
-            await asyncio.sleep(5)
-        
-        await asyncio.sleep(5)
-        await self.text_channel.send("Next song starting now!")
+            delay = self.delays['after_leaderboard']
+
+        self._schedule(delay, self._next_song)
+
+
+    def _schedule(self, delay, callback, *args):
+        """
+        Queue the next hint, timeout or round transition on the shared timer
+        wheel. Only one is ever pending, so a new one replaces the previous one.
+        """
+        if self.round_timer:
+            self.round_timer.cancel()
+        self.round_timer = WHEEL.call_later(delay, callback, *args)
+
+
+    def _schedule_round_deadline(self):
+        """Schedule the next hint of the current song, or its reveal once all hints are given."""
+        answer_time = self.delays['answer_time']
+        elapsed = self.HINT_STAGES[self.hint_stage - 1] * answer_time if self.hint_stage else 0
+        if self.hint_stage < len(self.HINT_STAGES):
+            self._schedule(self.HINT_STAGES[self.hint_stage] * answer_time - elapsed, self._give_hint, self.question_counter)
+        else:
+            self._schedule(answer_time - elapsed, self._time_up, self.question_counter)
+
+
+    async def _give_hint(self, song_number):
+        async with self.lock:
+            if not self.question_active or song_number != self.question_counter:
+                return
+            self.hint_stage += 1
+            hint = hint_for(self.current_song, self.hint_stage / (len(self.HINT_STAGES) + 1))
+            self.outbox.send(f"Hint: the song is `{hint}`")
+            self._schedule_round_deadline()
+
+
+    async def _time_up(self, song_number):
+        async with self.lock:
+            if not self.question_active or song_number != self.question_counter:
+                return
+            await self._reveal("Time's up! The correct song was")
+
+            # Stop a game nobody is playing anymore so it releases the voice connection
+            self.idle_rounds += 1
+            if self.idle_rounds >= self.MAX_IDLE_ROUNDS:
+                self.outbox.send("Nobody has guessed for a while, so the game is over.")
+                await self.end_game()
+
+
+    async def _next_song(self):
+        if self.finished or self.question_active:
+            return
+        self.outbox.send("Next song starting now!")
         await self.ask_song()
 
 
@@ -254,13 +514,42 @@ class GuessTheSongGame:
         Display the leaderboard, either as a final summary or current standings.
         """
         leaderboard = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)
-        leaderboard_message = "\n".join([f"{player.mention}: {score}" for player, score in leaderboard])
+        leaderboard_message = "\n".join([f"<@{user_id}>: {score}" for user_id, score in leaderboard])
         title = "Final Leaderboard:" if final else "Current Leaderboard:"
-        await self.text_channel.send(f"{title}\n{leaderboard_message}")
+        self.outbox.send(f"{title}\n{leaderboard_message}")
+
+        if final:
+            all_time = await STATS.leaderboard(self.guild_id, self.name, limit=5)
+            if all_time:
+                all_time_message = "\n".join([f"<@{user_id}>: {points}" for user_id, points in all_time])
+                self.outbox.send(f"All-time Guess the Song Leaderboard:\n{all_time_message}")
+
+
+    def _stop(self):
+        self.finished = True
+        self.question_active = False
+        self.answer_keys = []
+        if self.ingest_task:
+            self.ingest_task.cancel()
+        if self.round_timer:
+            self.round_timer.cancel()
+        if self.prefetcher:
+            self.prefetcher.stop()
+        for task in list(self.pending_calls):
+            task.cancel()
+
+
+    async def stand_down(self):
+        """Stop running the game in this process without ending it, after another worker took it over."""
+        self._stop()
+        await self.leave_voice_channel()
 
 
     async def end_game(self):
+        self._stop()
         # await self.text_channel.send("Game over!")
+        STATS.record_game(self.guild_id, self.name, self.scores)
+        SNAPSHOTS.discard(self.text_channel.id)
         await self.display_leaderboard(final=True)
-        await self.stop_song()
+        # Giving the connection back stops the song
         await self.leave_voice_channel()
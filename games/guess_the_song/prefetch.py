@@ -0,0 +1,65 @@
+import asyncio
+
+
+class SongPrefetcher:
+    """
+    Keeps the next few songs picked and resolved in the background so a round can
+    start as soon as the previous one ends. Songs that fail to resolve are
+    replaced by new picks; after too many failures in a row the queue yields None.
+    """
+    def __init__(self, pick, resolve, depth=2, max_failures=5):
+        self.pick = pick  # () -> track, or None when there is nothing left to play
+        self.resolve = resolve  # async (track) -> stream URL
+        self.queue = asyncio.Queue(maxsize=depth)
+        self.max_failures = max_failures
+        self.task = None
+        self.stopped = False
+
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+
+    def stop(self):
+        self.stopped = True
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        # Wake up a round that is waiting for a song that will never come
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+
+    async def get(self):
+        """Wait for the next ready (track, url), or None if no song could be prepared."""
+        return await self.queue.get()
+
+
+    async def _run(self):
+        failures = 0
+        while not self.stopped and failures < self.max_failures:
+            track = self.pick()
+            if track is None:
+                break
+
+            try:
+                url = await self.resolve(track)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Could not resolve {track}: {e!r}")
+                url = None
+
+            if self.stopped:
+                return
+            if not url:
+                failures += 1
+                continue
+
+            failures = 0
+            await self.queue.put((track, url))
+
+        await self.queue.put(None)
@@ -0,0 +1,104 @@
+import os
+import time
+import sqlite3
+import threading
+from urllib.parse import urlparse, parse_qs
+
+
+# Assume a stream URL without an expire parameter stays valid this long
+DEFAULT_STREAM_URL_LIFETIME = 5 * 60 * 60
+# Refresh stream URLs this many seconds before they actually expire
+STREAM_URL_MARGIN = 10 * 60
+
+
+def stream_url_expiry(url, now=None):
+    """Read the expiry timestamp YouTube puts in its stream URLs."""
+    now = time.time() if now is None else now
+    expire = parse_qs(urlparse(url).query).get('expire')
+    try:
+        return float(expire[0])
+    except (TypeError, ValueError):
+        return now + DEFAULT_STREAM_URL_LIFETIME
+
+
+class ResolutionCache:
+    """
+    On-disk cache of Spotify track ID -> resolved YouTube video. Stream URLs
+    expire after a few hours, so the video ID is kept separately and used to
+    refresh the URL without running another search. The least recently used
+    entries are evicted once the cache holds more than max_entries tracks.
+    Safe to use from the blocking-call worker threads.
+    """
+    def __init__(self, path, max_entries=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self._connection = None
+        self._lock = threading.Lock()
+
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS resolutions ("
+                "track_id TEXT PRIMARY KEY, video_id TEXT NOT NULL, duration REAL, "
+                "stream_url TEXT, expires_at REAL, resolved_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS resolutions_last_used ON resolutions (last_used)")
+            self._connection.commit()
+        return self._connection
+
+
+    def get(self, track_id):
+        """Return the cached resolution of a track as a dict, or None."""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT video_id, duration, stream_url, expires_at, resolved_at FROM resolutions WHERE track_id = ?",
+                (track_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE resolutions SET last_used = ? WHERE track_id = ?", (time.time(), track_id))
+            connection.commit()
+
+        video_id, duration, stream_url, expires_at, resolved_at = row
+        return {
+            'video_id': video_id,
+            'duration': duration,
+            'stream_url': stream_url,
+            'expires_at': expires_at,
+            'resolved_at': resolved_at,
+        }
+
+
+    def fresh_stream_url(self, entry, now=None):
+        """The cached stream URL if it is still valid for a whole round, else None."""
+        now = time.time() if now is None else now
+        if entry['stream_url'] and entry['expires_at'] and entry['expires_at'] - STREAM_URL_MARGIN > now:
+            return entry['stream_url']
+        return None
+
+
+    def put(self, track_id, video_id, duration, stream_url):
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO resolutions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (track_id, video_id, duration, stream_url, stream_url_expiry(stream_url, now), now, now),
+            )
+            connection.execute(
+                "DELETE FROM resolutions WHERE track_id IN "
+                "(SELECT track_id FROM resolutions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            connection.commit()
+
+
+    def discard(self, track_id):
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM resolutions WHERE track_id = ?", (track_id,))
+            connection.commit()
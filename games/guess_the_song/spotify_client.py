@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import threading
+
+
+SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
+SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
+
+# Only the parts of each playlist item the game uses
+PLAYLIST_ITEM_FIELDS = 'items(track(id,name,artists(name))),next'
+
+_spotify = None
+_spotify_lock = threading.Lock()
+
+
+def get_spotify():
+    """
+    Return the process-wide Spotify client. It keeps one pooled HTTP session and
+    reuses its client credentials token until it expires.
+    """
+    global _spotify
+    with _spotify_lock:
+        if _spotify is None:
+            # spotipy is slow to import, so it is only loaded once a game needs Spotify
+            import spotipy
+            from spotipy.cache_handler import MemoryCacheHandler
+            from spotipy.oauth2 import SpotifyClientCredentials
+
+            client_credentials_manager = SpotifyClientCredentials(
+                client_id=SPOTIFY_CLIENT_ID,
+                client_secret=SPOTIFY_CLIENT_SECRET,
+                cache_handler=MemoryCacheHandler(),
+            )
+            _spotify = spotipy.Spotify(client_credentials_manager=client_credentials_manager, requests_timeout=10)
+        return _spotify
+
+
+class PlaylistCache:
+    """
+    Local copies of playlists keyed by their Spotify snapshot_id. A playlist that
+    has not changed since it was last downloaded is served from memory, or from
+    disk after a restart, instead of paging through the API again.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._snapshots = {}  # Playlist ID -> (snapshot ID, tracks)
+        self._lock = threading.Lock()
+
+
+    def _path_for(self, playlist_id):
+        return os.path.join(self.directory, f"playlist_{playlist_id}.json")
+
+
+    def get(self, playlist_id, snapshot_id):
+        with self._lock:
+            cached = self._snapshots.get(playlist_id)
+        if cached and cached[0] == snapshot_id:
+            return cached[1]
+
+        try:
+            with open(self._path_for(playlist_id), encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if snapshot.get('snapshot_id') != snapshot_id:
+            return None
+
+        tracks = [tuple(track) for track in snapshot['tracks']]
+        with self._lock:
+            self._snapshots[playlist_id] = (snapshot_id, tracks)
+        return tracks
+
+
+    def put(self, playlist_id, snapshot_id, tracks):
+        with self._lock:
+            self._snapshots[playlist_id] = (snapshot_id, tracks)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path_for(playlist_id)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'snapshot_id': snapshot_id, 'tracks': tracks}, f, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+
+
+# Spotify search stops returning results past this offset
+SEARCH_OFFSET_LIMIT = 1000
+
+SOURCE_PATTERN = re.compile(r"(?:https?://open\.spotify\.com/|spotify:)(playlist|album)[/:]([A-Za-z0-9]+)")
+
+
+def parse_source(text):
+    """
+    Turn a playlist or album link/URI, a bare playlist ID or "genre:<name>" into a
+    (kind, value) source. Raises ValueError for anything else.
+    """
+    text = text.strip()
+    if text.lower().startswith('genre:'):
+        genre = text[len('genre:'):].strip()
+        if genre:
+            return 'genre', genre
+    match = SOURCE_PATTERN.match(text)
+    if match:
+        return match.group(1), match.group(2)
+    if re.fullmatch(r"[A-Za-z0-9]{22}", text):
+        return 'playlist', text
+    raise ValueError(f"Not a Spotify playlist, album or genre: {text}")
+
+
+def compact_track(track):
+    """Reduce a Spotify track object to (track ID, name, artists), or None for local/removed tracks."""
+    if not track or not track.get('name'):
+        return None
+    return track.get('id'), track['name'], [artist['name'] for artist in track['artists']]
+
+
+def _pages(spotify, paging):
+    """Follow a paging object of playlist items or album tracks, yielding the compact tracks of every page."""
+    while paging:
+        items = paging['items']
+        if items and 'track' in items[0]:
+            items = [item.get('track') for item in items]
+        yield [track for track in map(compact_track, items) if track]
+        paging = spotify.next(paging) if paging['next'] else None
+
+
+def iter_source_pages(source, cache):
+    """
+    Yield the tracks of a source one page at a time so a game can start on the
+    first page. Playlists whose snapshot_id is unchanged come from the cache as a
+    single page. Blocking; call next() on it in the thread pool.
+    """
+    spotify = get_spotify()
+    kind, value = source
+
+    if kind == 'playlist':
+        snapshot_id = spotify.playlist(value, fields='snapshot_id')['snapshot_id']
+        tracks = cache.get(value, snapshot_id)
+        if tracks is not None:
+            yield tracks
+            return
+
+        tracks = []
+        response = spotify.playlist_items(value, fields=PLAYLIST_ITEM_FIELDS, additional_types=('track',))
+        for page in _pages(spotify, response):
+            tracks.extend(page)
+            yield page
+        cache.put(value, snapshot_id, tracks)
+
+    elif kind == 'album':
+        album = spotify.album(value)
+        for page in _pages(spotify, album['tracks']):
+            yield page
+
+    elif kind == 'genre':
+        offset = 0
+        while offset < SEARCH_OFFSET_LIMIT:
+            response = spotify.search(q=f'genre:"{value}"', type='track', limit=50, offset=offset)
+            items = response['tracks']['items']
+            if not items:
+                break
+            yield [track for track in map(compact_track, items) if track]
+            offset += len(items)
+            if not response['tracks']['next']:
+                break
@@ -0,0 +1,64 @@
+import random
+from array import array
+
+from games.answer_matching import AnswerKey
+
+
+class Track:
+    """One playable song with its answer keys normalized up front."""
+    __slots__ = ('track_id', 'name', 'artists', 'title_key', 'artist_keys')
+
+    def __init__(self, track_id, name, artists):
+        self.track_id = track_id
+        self.name = name
+        self.artists = tuple(artists)
+        # Spotify titles often carry a " - Remastered 2011" style suffix, accept the bare title too
+        self.title_key = AnswerKey(name, aliases=[name.split(' - ')[0]])
+        self.artist_keys = tuple(AnswerKey(artist) for artist in self.artists)
+
+
+    def __repr__(self):
+        return f"Track({self.name!r} by {', '.join(self.artists)})"
+
+
+class TrackTable:
+    """
+    The tracks of a loaded playlist plus a shuffled draw order. Every track is
+    played once before any repeats, and each draw is O(1). Tracks can be added
+    while a game is running; they are shuffled into the remaining order.
+    """
+    def __init__(self, tracks=()):
+        self.tracks = []
+        self._order = array('I')  # Indexes into self.tracks not yet drawn this cycle
+        self.extend(tracks)
+
+
+    def extend(self, rows):
+        """Add (track ID, name, artists) rows."""
+        self.add(Track(track_id, name, artists) for track_id, name, artists in rows)
+
+
+    def add(self, tracks):
+        """Add already built Track records."""
+        for track in tracks:
+            index = len(self.tracks)
+            self.tracks.append(track)
+
+            # Insert at a random position of the remaining order (inside-out Fisher-Yates)
+            self._order.append(index)
+            swap = random.randrange(len(self._order))
+            self._order[-1], self._order[swap] = self._order[swap], self._order[-1]
+
+
+    def __len__(self):
+        return len(self.tracks)
+
+
+    def draw(self):
+        """Return the next track, starting a new shuffled cycle once all have been played."""
+        if not self.tracks:
+            return None
+        if not self._order:
+            self._order = array('I', range(len(self.tracks)))
+            random.shuffle(self._order)
+        return self.tracks[self._order.pop()]
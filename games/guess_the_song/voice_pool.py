@@ -0,0 +1,99 @@
+import os
+import asyncio
+
+from games.metrics import METRICS
+from games.scheduler import WHEEL
+
+
+# Seconds a voice connection stays open after its game ends, ready for the next game
+VOICE_IDLE_SECONDS = float(os.getenv('VOICE_IDLE_SECONDS', '300'))
+
+
+class VoicePool:
+    """
+    Voice connections kept warm between Guess the Song games, one per guild
+    since Discord gives a bot a single voice connection per guild. A game
+    borrows its guild's connection, which is moved if the game plays in another
+    voice channel, and gives it back when it ends. The connection is only
+    closed after idle_seconds without a game, so back-to-back games skip the
+    voice handshake. A connection that has dropped is replaced on the next
+    acquire.
+    """
+    def __init__(self, idle_seconds=300.0):
+        self.idle_seconds = idle_seconds
+        self._clients = {}  # guild ID -> voice client
+        self._holders = {}  # guild ID -> game using the connection
+        self._idle_timers = {}  # guild ID -> timer that closes an unused connection
+        self._locks = {}  # guild ID -> lock, created inside the bot's event loop
+
+
+    def _lock(self, guild_id):
+        lock = self._locks.get(guild_id)
+        if lock is None:
+            lock = self._locks[guild_id] = asyncio.Lock()
+        return lock
+
+
+    async def acquire(self, voice_channel, holder):
+        """
+        Return a connected voice client in voice_channel for holder, reusing the
+        guild's connection. Returns None while another game holds it.
+        """
+        guild_id = voice_channel.guild.id
+        async with self._lock(guild_id):
+            if self._holders.get(guild_id, holder) is not holder:
+                return None
+            timer = self._idle_timers.pop(guild_id, None)
+            if timer:
+                timer.cancel()
+
+            client = self._clients.get(guild_id)
+            if client is not None and client.is_connected():
+                if client.channel.id != voice_channel.id:
+                    await client.move_to(voice_channel)
+                METRICS.increment('sgb_voice_connects_total', outcome='reused')
+            else:
+                if client is not None:
+                    # Dropped for good, e.g. the bot was kicked from the channel
+                    await client.disconnect(force=True)
+                client = await voice_channel.connect(reconnect=True)
+                METRICS.increment('sgb_voice_connects_total', outcome='new')
+
+            self._clients[guild_id] = client
+            self._holders[guild_id] = holder
+            return client
+
+
+    async def release(self, guild_id, holder):
+        """Give a connection back; it is closed once it has been idle for idle_seconds."""
+        async with self._lock(guild_id):
+            if self._holders.get(guild_id) is not holder:
+                return
+            del self._holders[guild_id]
+            client = self._clients.get(guild_id)
+            if client is None:
+                return
+            if client.is_playing():
+                client.stop()
+            if self.idle_seconds:
+                self._idle_timers[guild_id] = WHEEL.call_later(self.idle_seconds, self._close_idle, guild_id)
+                return
+        await self._close_idle(guild_id)
+
+
+    async def _close_idle(self, guild_id):
+        async with self._lock(guild_id):
+            self._idle_timers.pop(guild_id, None)
+            if guild_id in self._holders:
+                return  # Picked up by a new game meanwhile
+            client = self._clients.pop(guild_id, None)
+        if client is not None:
+            await client.disconnect()
+
+
+    def __len__(self):
+        return len(self._clients)
+
+
+# The voice connections of every Guess the Song game
+VOICE_POOL = VoicePool(VOICE_IDLE_SECONDS)
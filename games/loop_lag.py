@@ -0,0 +1,43 @@
+import asyncio
+
+from games.metrics import METRICS
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up from a short sleep. Anything that
+    blocks the loop (a synchronous network call, heavy parsing) shows up as lag.
+    """
+    def __init__(self, interval=0.5, report_every=60):
+        self.interval = interval
+        self.report_every = report_every
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.task = None
+
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_report = loop.time()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - expected)
+            self.max_lag = max(self.max_lag, self.last_lag)
+            METRICS.observe('sgb_event_loop_lag_seconds', self.last_lag)
+
+            if self.report_every and loop.time() - last_report >= self.report_every:
+                print(f"Event loop lag: last {self.last_lag * 1000:.1f}ms, max {self.max_lag * 1000:.1f}ms over {self.report_every}s")
+                self.max_lag = 0.0
+                last_report = loop.time()
@@ -0,0 +1,114 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from games.answer_matching import normalize, find_match, match_batch
+from games.metrics import METRICS
+
+
+# Processes that match guesses off the event loop; 0 (the default) matches them on the loop,
+# which is faster unless answer spam stalls the loop
+MATCH_WORKERS = int(os.getenv('MATCH_WORKERS', '0'))
+# Most guesses sent to a worker in one call
+MATCH_BATCH_SIZE = int(os.getenv('MATCH_BATCH_SIZE', '256'))
+
+
+class MatchPool:
+    """
+    Normalizes and fuzzy matches chat guesses in a pool of worker processes, so
+    the event loop only does I/O however fast answers come in. Guesses that
+    arrive while every worker is busy are queued and sent together, so under
+    spam one call (and one round of pickling) covers a whole batch. The keys of
+    a game are sent once per batch however many guesses they are checked
+    against. If the pool breaks, guesses are matched on the loop.
+    """
+    def __init__(self, workers, batch_size=256):
+        self.workers = workers
+        self.batch_size = batch_size
+        self._executor = None
+        self._pending = []  # (answer keys, guess, future) waiting for a free worker
+        self._in_flight = 0
+        self._flush_scheduled = False
+
+
+    def start(self):
+        """
+        Start the worker processes. They are spawned, so each one imports the
+        main script as __mp_main__ (whose startup must be behind a __main__
+        guard) before it serves answer matching. Returns a future that is done
+        once they are up, or None when there is no pool.
+        """
+        if self.workers and self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            # Spawning takes a moment; start now instead of on the first guess
+            return self._executor.submit(match_batch, [])
+        return None
+
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+    async def match(self, answer_keys, guess):
+        """Return the answer key a raw guess matches, or None."""
+        if not self.workers or not answer_keys:
+            return find_match(answer_keys, normalize(guess))
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((tuple(answer_keys), guess, future))
+        self._schedule()
+        return await future
+
+
+    def _schedule(self):
+        # Wait for the end of this loop iteration, so guesses dispatched together share a batch
+        if self._pending and self._in_flight < max(self.workers, 1) and not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+
+    def _flush(self):
+        self._flush_scheduled = False
+        while self._pending and self._in_flight < max(self.workers, 1):
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            self._in_flight += 1
+            asyncio.ensure_future(self._run(batch))
+
+
+    async def _run(self, batch):
+        # Group the guesses by the keys they are checked against
+        groups = {}
+        for answer_keys, guess, future in batch:
+            group = groups.setdefault(tuple(map(id, answer_keys)), (answer_keys, [], []))
+            group[1].append(guess)
+            group[2].append(future)
+        payload = [(answer_keys, guesses) for answer_keys, guesses, _ in groups.values()]
+
+        METRICS.observe('sgb_match_batch_size', len(batch))
+        try:
+            if self.workers:
+                self.start()
+                with METRICS.timer('sgb_match_batch_seconds'):
+                    results = await asyncio.get_running_loop().run_in_executor(self._executor, match_batch, payload)
+            else:
+                results = match_batch(payload)
+        except Exception as e:
+            print(f"Error matching guesses in the worker pool, matching on the event loop: {e!r}")
+            self.stop()
+            self.workers = 0
+            results = match_batch(payload)
+        finally:
+            self._in_flight -= 1
+            self._schedule()
+
+        for (answer_keys, _, futures), indexes in zip(groups.values(), results):
+            for future, index in zip(futures, indexes):
+                if not future.done():
+                    future.set_result(None if index is None else answer_keys[index])
+
+
+# The pool every chat guess is matched in
+MATCH_POOL = MatchPool(MATCH_WORKERS, MATCH_BATCH_SIZE)
@@ -0,0 +1,208 @@
+import json
+import time
+import asyncio
+from contextlib import contextmanager
+
+
+class Summary:
+    """Count and sum of observations, plus the largest one since the last log line."""
+    __slots__ = ('count', 'total', 'window_max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.window_max = 0.0
+
+
+class Metrics:
+    """
+    In-process counters, gauges and timing summaries, keyed by name and labels.
+    Recording is a dict update, cheap enough for every message. The values are
+    read as Prometheus text (render) or as one structured log line.
+    """
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.summaries = {}
+        self.callbacks = {}  # Gauges computed when the metrics are read
+
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+
+    def increment(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+
+    def set(self, name, value, **labels):
+        self.gauges[self._key(name, labels)] = value
+
+
+    def adjust(self, name, delta, **labels):
+        key = self._key(name, labels)
+        self.gauges[key] = self.gauges.get(key, 0) + delta
+
+
+    def gauge_callback(self, name, func, **labels):
+        self.callbacks[self._key(name, labels)] = func
+
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        summary = self.summaries.get(key)
+        if summary is None:
+            summary = self.summaries[key] = Summary()
+        summary.count += 1
+        summary.total += value
+        if value > summary.window_max:
+            summary.window_max = value
+
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe how many seconds the block took, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+
+    def _gauge_values(self):
+        values = dict(self.gauges)
+        for key, func in self.callbacks.items():
+            try:
+                values[key] = func()
+            except Exception as e:
+                print(f"Metric {key[0]} failed: {e!r}")
+        return values
+
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for key, value in sorted(self.counters.items()):
+            lines.append(_sample(key[0], key[1], value))
+        for key, value in sorted(self._gauge_values().items()):
+            lines.append(_sample(key[0], key[1], value))
+        for (name, labels), summary in sorted(self.summaries.items()):
+            lines.append(_sample(f"{name}_count", labels, summary.count))
+            lines.append(_sample(f"{name}_sum", labels, summary.total))
+        return "\n".join(lines) + "\n"
+
+
+    def log_line(self):
+        """All metrics as one JSON object; summaries show their average and the max since the last line."""
+        record = {}
+        for key, value in self.counters.items():
+            record[_label_name(key)] = value
+        for key, value in self._gauge_values().items():
+            record[_label_name(key)] = value
+        for key, summary in self.summaries.items():
+            record[_label_name(key)] = {
+                'count': summary.count,
+                'avg_ms': round(summary.total / summary.count * 1000, 3) if summary.count else 0.0,
+                'max_ms': round(summary.window_max * 1000, 3),
+            }
+            summary.window_max = 0.0
+        return json.dumps(record, sort_keys=True)
+
+
+def _label_name(key):
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{label}={value}" for label, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _sample(name, labels, value):
+    if labels:
+        rendered = ",".join(f'{label}="{_escape(label_value)}"' for label, label_value in labels)
+        return f"{name}{{{rendered}}} {value}"
+    return f"{name} {value}"
+
+
+class TimedLock(asyncio.Lock):
+    """
+    asyncio.Lock that records how long every acquisition waited and how often it
+    was already held. observer(wait, contended), if given, also sees every one.
+    """
+    def __init__(self, game, observer=None):
+        super().__init__()
+        self.game = game
+        self.observer = observer
+
+
+    async def acquire(self):
+        contended = self.locked()
+        if contended:
+            METRICS.increment('sgb_lock_contended_total', game=self.game)
+        start = time.perf_counter()
+        await super().acquire()
+        wait = time.perf_counter() - start
+        METRICS.observe('sgb_lock_wait_seconds', wait, game=self.game)
+        if self.observer:
+            self.observer(wait, contended)
+        return True
+
+
+class MetricsServer:
+    """Answers every HTTP request on a local port with the current metrics."""
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        self.metrics = metrics
+        self.port = port
+        self.host = host
+        self.server = None
+
+
+    async def start(self):
+        if self.server is None:
+            self.server = await asyncio.start_server(self._handle, self.host, self.port)
+            print(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+
+    async def _handle(self, reader, writer):
+        try:
+            # Only the request line matters; the rest of the request is skipped
+            await asyncio.wait_for(reader.readline(), 5)
+            body = self.metrics.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class MetricsLogger:
+    """Prints the metrics as a structured log line every interval seconds."""
+    def __init__(self, metrics, interval):
+        self.metrics = metrics
+        self.interval = interval
+        self.task = None
+
+
+    def start(self):
+        if self.interval and (self.task is None or self.task.done()):
+            self.task = asyncio.create_task(self._run())
+
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            print(f"metrics {self.metrics.log_line()}")
+
+
+# The metrics every module records to
+METRICS = Metrics()
@@ -0,0 +1,144 @@
+import time
+import asyncio
+import weakref
+
+import discord
+
+from games.metrics import METRICS
+
+
+# Discord rejects messages longer than this
+MESSAGE_LIMIT = 2000
+
+
+class RateLimitBucket:
+    """
+    Token bucket mirroring one Discord route's rate limit, by default the
+    5 messages per 5 seconds allowed per channel. Sends wait for a token here
+    instead of running into a 429.
+    """
+    def __init__(self, capacity=5, period=5.0):
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity)
+        self.updated = None
+        self.rate_limited = 0  # 429s received despite the bucket
+
+
+    def _refill(self, now):
+        if self.updated is None:
+            self.updated = now
+        elif now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.period)
+            self.updated = now
+
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            self._refill(now)
+            if self.tokens >= 1 and now >= self.updated:
+                self.tokens -= 1
+                return
+            wait = max(self.updated - now, (1 - self.tokens) * self.period / self.capacity)
+            await asyncio.sleep(wait)
+
+
+    def penalize(self, retry_after):
+        """Empty the bucket after Discord answered with a 429."""
+        self.rate_limited += 1
+        self.tokens = 0
+        self.updated = asyncio.get_running_loop().time() + retry_after
+
+
+class Outbox:
+    """
+    Coalesces the messages a game produces in the same loop tick into as few
+    Discord messages as possible and sends them in order, paced by a rate limit
+    bucket. send() returns a future resolving to the sent discord.Message, so
+    callers can fire and forget.
+    """
+    def __init__(self, send, bucket):
+        self._send = send
+        self.bucket = bucket
+        self._pending = []  # (content, future)
+        self._flush_task = None
+
+
+    def send(self, content):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((str(content), future))
+        # The flush starts on the next loop iteration, after everything queued this tick
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush())
+        return future
+
+
+    async def _flush(self):
+        while self._pending:
+            batch, self._pending = self._pending, []
+            for content, futures in _chunk(batch):
+                try:
+                    message = await self._send_chunk(content)
+                except Exception as e:
+                    # E.g. a dropped connection; the rest of the batch is still sent
+                    METRICS.increment('sgb_send_errors_total')
+                    print(f"Error sending message: {e!r}")
+                    message = None
+                for future in futures:
+                    if not future.done():
+                        future.set_result(message)
+
+
+    async def _send_chunk(self, content):
+        while True:
+            await self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                return await self._send(content)
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    METRICS.increment('sgb_send_errors_total')
+                    print(f"Error sending message: {e}")
+                    return None
+                METRICS.increment('sgb_send_rate_limited_total')
+                self.bucket.penalize(getattr(e, 'retry_after', None) or self.bucket.period)
+            finally:
+                METRICS.observe('sgb_send_seconds', time.perf_counter() - start)
+
+
+def _chunk(batch):
+    """Join queued messages with newlines into pieces that fit in one Discord message."""
+    chunks = []
+    content, futures = "", []
+    for text, future in batch:
+        if content and len(content) + 1 + len(text) > MESSAGE_LIMIT:
+            chunks.append((content, futures))
+            content, futures = "", []
+        while len(text) > MESSAGE_LIMIT:
+            chunks.append((text[:MESSAGE_LIMIT], []))
+            text = text[MESSAGE_LIMIT:]
+        content = f"{content}\n{text}" if content else text
+        futures.append(future)
+    if content:
+        chunks.append((content, futures))
+    return chunks
+
+
+# Held weakly: an outbox, and the channel its send method keeps alive, lasts as long as a game uses it
+_channel_outboxes = weakref.WeakValueDictionary()
+
+
+def channel_outbox(channel):
+    """The shared outbox of a text channel."""
+    outbox = _channel_outboxes.get(channel.id)
+    if outbox is None:
+        outbox = _channel_outboxes[channel.id] = Outbox(channel.send, RateLimitBucket())
+    return outbox
+
+
+def followup_outbox(interaction):
+    """An outbox for the follow-up messages of one deferred interaction."""
+    return Outbox(interaction.followup.send, RateLimitBucket())
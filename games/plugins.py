@@ -0,0 +1,50 @@
+import time
+import importlib
+
+from games.metrics import METRICS
+from games.startup import IMPORT_TIMER
+
+
+class GamePlugin:
+    """
+    A game whose module is only imported the first time it is played, so its
+    dependencies (Spotify, yt-dlp, ...) do not slow down bot startup.
+    """
+    def __init__(self, name, module, class_name):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self._game_class = None
+
+
+    @property
+    def loaded(self):
+        return self._game_class is not None
+
+
+    def load(self):
+        """Import the game module if needed and return its game class."""
+        if self._game_class is None:
+            start = time.perf_counter()
+            module = importlib.import_module(self.module)
+            elapsed = time.perf_counter() - start
+            self._game_class = getattr(module, self.class_name)
+            IMPORT_TIMER.record(self.module, elapsed)
+            METRICS.set('sgb_plugin_import_seconds', elapsed, game=self.name)
+            print(f"Loaded {self.name} in {elapsed * 1000:.0f}ms")
+        return self._game_class
+
+
+# Every game the bot can run, by the name its game class reports
+GAME_PLUGINS = {
+    plugin.name: plugin for plugin in (
+        GamePlugin('threeman', 'games.threeman', 'ThreeManGame'),
+        GamePlugin('trivia', 'games.trivia.trivia', 'TriviaGame'),
+        GamePlugin('guess_the_song', 'games.guess_the_song.guess_the_song', 'GuessTheSongGame'),
+    )
+}
+
+
+def game_class(name):
+    """The game class of a plugin, imported on first use."""
+    return GAME_PLUGINS[name].load()
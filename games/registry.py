@@ -0,0 +1,79 @@
+class GameRegistry:
+    """
+    Tracks the active game for every (guild, channel) pair so that several games
+    can run side by side in one process. With a store (see games.snapshots), a
+    game is only added once this worker has claimed its channel, so when several
+    processes share the store every game runs in exactly one of them.
+    """
+    def __init__(self, store=None):
+        self.store = store
+        self._games = {}
+
+
+    @staticmethod
+    def key_for(channel):
+        """Build the registry key for a text channel."""
+        guild = getattr(channel, 'guild', None)
+        return (guild.id if guild else None, channel.id)
+
+
+    def get(self, channel):
+        """Return the active game in a channel, dropping it if it has finished."""
+        key = self.key_for(channel)
+        game = self._games.get(key)
+        if game is not None and game.finished:
+            del self._games[key]
+            return None
+        return game
+
+
+    def candidate(self, message):
+        """
+        Return the game a chat message could answer, or None when the message is
+        from another channel or a non-player, or no answer is open.
+        """
+        game = self._games.get(self.key_for(message.channel))
+        if game is None or not game.answer_keys:
+            return None
+        if message.author.id not in game.player_ids:
+            return None
+        return game
+
+
+    async def add(self, channel, game):
+        """Add a game, unless another worker owns the channel. Returns whether it was added."""
+        key = self.key_for(channel)
+        if self.store is not None and not await self.store.claim(channel.id, key[0] or 0):
+            return False
+        self._games[key] = game
+        return True
+
+
+    def remove(self, channel):
+        game = self._games.pop(self.key_for(channel), None)
+        if game is not None and self.store is not None:
+            self.store.release(channel.id)
+        return game
+
+
+    def drop_channels(self, channel_ids):
+        """Remove and return the games of the given channels, e.g. those another worker took over."""
+        channel_ids = set(channel_ids)
+        dropped = [key for key in self._games if key[1] in channel_ids]
+        return [self._games.pop(key) for key in dropped]
+
+
+    def prune(self):
+        """Drop every game that has finished on its own."""
+        for key in [key for key, game in self._games.items() if game.finished]:
+            del self._games[key]
+
+
+    def __len__(self):
+        self.prune()
+        return len(self._games)
+
+
+    def __iter__(self):
+        self.prune()
+        return iter(list(self._games.values()))
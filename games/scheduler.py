@@ -0,0 +1,96 @@
+import math
+import asyncio
+
+
+class Timer:
+    """Handle of a scheduled callback; cancelling it is O(1)."""
+    __slots__ = ('callback', 'args', 'rounds', 'cancelled')
+
+    def __init__(self, callback, args, rounds):
+        self.callback = callback
+        self.args = args
+        self.rounds = rounds  # Full turns of the wheel left before the timer is due
+        self.cancelled = False
+
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel shared by every game for round transitions, reveal
+    timeouts and other delays. Scheduling and cancelling are O(1), and one task
+    drives all pending timers no matter how many games are running, ticking only
+    while timers are pending. Callbacks may be plain functions or coroutine
+    functions; coroutines are run as tasks.
+    """
+    def __init__(self, tick=0.1, slots=512):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.current = 0
+        self.pending = 0
+        self._task = None
+        self._running = set()  # Tasks started by timers, kept referenced until they finish
+
+
+    def call_later(self, delay, callback, *args):
+        """Run callback(*args) after roughly delay seconds (rounded up to the next tick)."""
+        ticks = max(1, math.ceil(delay / self.tick))
+        timer = Timer(callback, args, (ticks - 1) // len(self.slots))
+        self.slots[(self.current + ticks) % len(self.slots)].append(timer)
+        self.pending += 1
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return timer
+
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        while self.pending:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            # Catch up on every tick that passed, in case the loop was late
+            while next_tick <= loop.time() and self.pending:
+                next_tick += self.tick
+                self._advance()
+
+
+    def _advance(self):
+        self.current = (self.current + 1) % len(self.slots)
+        due, remaining = self.slots[self.current], []
+        self.slots[self.current] = remaining
+
+        for timer in due:
+            if timer.cancelled:
+                self.pending -= 1
+            elif timer.rounds:
+                timer.rounds -= 1
+                remaining.append(timer)
+            else:
+                self.pending -= 1
+                self._fire(timer)
+
+
+    def _fire(self, timer):
+        try:
+            result = timer.callback(*timer.args)
+        except Exception as e:
+            print(f"Timer callback {timer.callback!r} failed: {e!r}")
+            return
+
+        if asyncio.iscoroutine(result):
+            task = asyncio.get_running_loop().create_task(result)
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+
+    def _finished(self, task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Timer task failed: {task.exception()!r}")
+
+
+# The wheel every game schedules on
+WHEEL = TimerWheel()
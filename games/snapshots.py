@@ -0,0 +1,307 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Where the state of running games is kept so they can resume after a restart
+SNAPSHOT_PATH = os.getenv('SGB_SNAPSHOT_PATH', os.path.join('data', 'games.jsonl'))
+# 'log' keeps games in this process only; 'sqlite' shares them between bot processes on one host
+STATE_BACKEND = os.getenv('SGB_STATE_BACKEND', 'log')
+STATE_PATH = os.getenv('SGB_STATE_PATH', os.path.join('data', 'games.db'))
+# Name this process holds its game leases under; must differ between processes sharing STATE_PATH
+WORKER_ID = os.getenv('SGB_WORKER_ID') or f"{os.getenv('DYNO') or socket.gethostname()}:{os.getenv('SHARD_IDS') or 'all'}"
+# Seconds a game stays owned by a worker that stopped renewing its leases
+LEASE_SECONDS = float(os.getenv('SGB_LEASE_SECONDS', '60'))
+
+
+class WriterThread:
+    """One thread per store that does its file or database work in the order it was queued."""
+    def __init__(self):
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='game-store')
+
+
+    async def _call(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._writer, func, *args)
+
+
+    def _queue(self, func, *args):
+        self._writer.submit(func, *args).add_done_callback(_report_error)
+
+
+class SnapshotLog(WriterThread):
+    """
+    Append-only log of game snapshots, one JSON line per state transition and
+    keyed by text channel ID. A later line for a channel replaces the earlier
+    ones and a null snapshot removes the game, so a save is a single small
+    append that is cheap enough for every roll. Once the log holds
+    compact_every lines (and at least twice as many as there are live games),
+    it is rewritten with only the live snapshots. A line
+    cut short by a crash is ignored when the log is loaded. The live snapshots
+    are kept on the event loop; reading, appending and compacting the file
+    happen on the writer thread.
+    """
+    def __init__(self, path, compact_every=1000):
+        super().__init__()
+        self.path = path
+        self.compact_every = compact_every
+        self._live = None  # channel ID -> latest snapshot, read from the log on first use
+        self._lines = 0
+        self._read_live = None  # What the writer thread read from the log
+        self._file = None  # Only used on the writer thread
+
+
+    async def claim(self, channel_id, guild_id):
+        """Only this process runs games, so it owns every one of them."""
+        return True
+
+
+    def release(self, channel_id):
+        pass
+
+
+    async def renew(self):
+        """Return the channels whose games this process lost; never any."""
+        return []
+
+
+    async def load(self, owns_guild=None):
+        """Return (channel ID, latest snapshot) of every game that has not ended."""
+        if self._live is None:
+            self._use(await self._call(self._read))
+        return list(self._live.items())
+
+
+    def entries(self):
+        """Like load, but waits for the first read of the log on the calling thread."""
+        if self._live is None:
+            self._use(self._writer.submit(self._read).result())
+        return list(self._live.items())
+
+
+    def _use(self, live):
+        if self._live is None:
+            self._live = live
+            self._lines = len(live)
+
+
+    def save(self, channel_id, snapshot):
+        self.entries()
+        self._live[channel_id] = snapshot
+        self._append(channel_id, snapshot)
+
+
+    def discard(self, channel_id):
+        self.entries()
+        if self._live.pop(channel_id, None) is not None:
+            self._append(channel_id, None)
+
+
+    def _append(self, channel_id, snapshot):
+        if self._lines >= max(self.compact_every, 2 * len(self._live)):
+            self._lines = len(self._live)
+            self._queue(self._compact, list(self._live.items()))
+            return
+        self._lines += 1
+        self._queue(self._write_line, json.dumps({'channel_id': channel_id, 'snapshot': snapshot}, separators=(',', ':')) + "\n")
+
+
+    def _read(self):
+        """Read the log and compact it, once; later calls return the same snapshots."""
+        if self._read_live is None:
+            live = {}
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if entry.get('snapshot') is None:
+                            live.pop(entry['channel_id'], None)
+                        else:
+                            live[entry['channel_id']] = entry['snapshot']
+            except FileNotFoundError:
+                pass
+            self._compact(list(live.items()))
+            self._read_live = live
+        return self._read_live
+
+
+    def _write_line(self, line):
+        self._file.write(line)
+        # Hand the line to the OS right away, so a crash of the bot does not lose it
+        self._file.flush()
+
+
+    def _compact(self, entries):
+        """Rewrite the log with only the live snapshots and reopen it for appending."""
+        if self._file:
+            self._file.close()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        partial_path = f"{self.path}.part"
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            for channel_id, snapshot in entries:
+                f.write(json.dumps({'channel_id': channel_id, 'snapshot': snapshot}, separators=(',', ':')) + "\n")
+        os.replace(partial_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+
+class SQLiteGameStore(WriterThread):
+    """
+    Snapshots and ownership of the running games, shared by several bot
+    processes through one SQLite file in WAL mode. Every game is owned by the
+    worker holding its lease: claim takes a free or expired lease in a single
+    upsert, so two workers can never both win it, and the owner keeps it by
+    renewing its leases (and with every save) more often than lease_seconds.
+    Saves and discards only touch games the worker still owns, so a worker
+    that lost a game cannot overwrite the new owner's state. Every query runs
+    on one writer thread of the store, in the order it was made, so waiting for
+    another process's write lock never stalls the event loop; saves, discards
+    and releases are queued without waiting for them.
+    """
+    def __init__(self, path, worker_id, lease_seconds=60.0):
+        super().__init__()
+        self.path = path
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self._owned = set()  # Channel IDs this worker believes it owns
+        self._connection = None  # Only used on the writer thread
+
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=5)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                "channel_id INTEGER PRIMARY KEY, guild_id INTEGER NOT NULL, owner TEXT NOT NULL, "
+                "lease_expires REAL NOT NULL, snapshot TEXT)"
+            )
+            self._connection.commit()
+        return self._connection
+
+
+    async def claim(self, channel_id, guild_id):
+        """Take the lease of a channel's game unless another worker holds it. Returns whether this worker owns it."""
+        return await self._call(self._claim, channel_id, guild_id)
+
+
+    def _claim(self, channel_id, guild_id):
+        now = time.time()
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT INTO games (channel_id, guild_id, owner, lease_expires) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (channel_id) DO UPDATE SET owner = excluded.owner, lease_expires = excluded.lease_expires "
+                "WHERE games.owner = excluded.owner OR games.lease_expires < ?",
+                (channel_id, guild_id, self.worker_id, now + self.lease_seconds, now),
+            )
+            row = connection.execute("SELECT owner FROM games WHERE channel_id = ?", (channel_id,)).fetchone()
+        if row is None or row[0] != self.worker_id:
+            return False
+        self._owned.add(channel_id)
+        return True
+
+
+    def release(self, channel_id):
+        """Give up a game without ending it, so any worker may claim it right away."""
+        self._queue(self._release, channel_id)
+
+
+    def _release(self, channel_id):
+        self._owned.discard(channel_id)
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "UPDATE games SET lease_expires = 0 WHERE channel_id = ? AND owner = ?", (channel_id, self.worker_id)
+            )
+
+
+    async def renew(self):
+        """Extend every lease of this worker. Returns the channels whose games were taken over meanwhile."""
+        return await self._call(self._renew)
+
+
+    def _renew(self):
+        connection = self._connect()
+        with connection:
+            # Released leases (expiring at 0) stay free
+            connection.execute(
+                "UPDATE games SET lease_expires = ? WHERE owner = ? AND lease_expires > 0",
+                (time.time() + self.lease_seconds, self.worker_id),
+            )
+            owned = {row[0] for row in connection.execute("SELECT channel_id FROM games WHERE owner = ?", (self.worker_id,))}
+        lost = [channel_id for channel_id in self._owned if channel_id not in owned]
+        self._owned.difference_update(lost)
+        return lost
+
+
+    async def load(self, owns_guild=None):
+        """
+        Claim and return (channel ID, latest snapshot) of every saved game that is
+        this worker's or has been abandoned by its owner, limited to the guilds
+        owns_guild accepts (e.g. those on this process's shards).
+        """
+        return await self._call(self._load, owns_guild)
+
+
+    def _load(self, owns_guild):
+        rows = self._connect().execute(
+            "SELECT channel_id, guild_id, snapshot FROM games "
+            "WHERE snapshot IS NOT NULL AND (owner = ? OR lease_expires < ?)",
+            (self.worker_id, time.time()),
+        ).fetchall()
+        return [
+            (channel_id, json.loads(snapshot)) for channel_id, guild_id, snapshot in rows
+            if (owns_guild is None or owns_guild(guild_id)) and self._claim(channel_id, guild_id)
+        ]
+
+
+    def save(self, channel_id, snapshot):
+        # Serialized now, while the snapshot matches the game
+        self._queue(self._save, channel_id, json.dumps(snapshot, separators=(',', ':')))
+
+
+    def _save(self, channel_id, snapshot):
+        connection = self._connect()
+        with connection:
+            updated = connection.execute(
+                "UPDATE games SET snapshot = ?, lease_expires = ? WHERE channel_id = ? AND owner = ?",
+                (snapshot, time.time() + self.lease_seconds, channel_id, self.worker_id),
+            ).rowcount
+        if not updated:
+            print(f"Not saving the game in channel {channel_id}: another worker owns it")
+
+
+    def discard(self, channel_id):
+        self._queue(self._discard, channel_id)
+
+
+    def _discard(self, channel_id):
+        self._owned.discard(channel_id)
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM games WHERE channel_id = ? AND owner = ?", (channel_id, self.worker_id))
+
+
+def _report_error(future):
+    if future.exception():
+        print(f"Error writing game state: {future.exception()!r}")
+
+
+def create_store():
+    if STATE_BACKEND == 'sqlite':
+        return SQLiteGameStore(STATE_PATH, WORKER_ID, LEASE_SECONDS)
+    if STATE_BACKEND != 'log':
+        raise ValueError(f"Unknown SGB_STATE_BACKEND {STATE_BACKEND!r}, expected 'log' or 'sqlite'")
+    return SnapshotLog(SNAPSHOT_PATH)
+
+
+# Where every game saves its snapshots and claims its channel
+SNAPSHOTS = create_store()
@@ -0,0 +1,66 @@
+import sys
+import time
+import builtins
+
+
+class ImportTimer:
+    """
+    Measures where cold start time goes. While installed, every top-level import
+    statement is timed, including everything it pulls in, and the time is added
+    to the imported package. Imports nested inside another import are not
+    counted separately, so the times add up to the total. Only meant for the
+    single-threaded startup; uninstall it once the bot is ready.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.times = {}  # Top-level package -> seconds spent importing it
+        self._depth = 0
+        self._original_import = None
+
+
+    @property
+    def installed(self):
+        return self._original_import is not None
+
+
+    def install(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if self._depth or (level == 0 and name in sys.modules and not fromlist):
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            package = name.partition('.')[0] if level == 0 else (globals or {}).get('__package__') or name
+            self.times[package] = self.times.get(package, 0.0) + time.perf_counter() - start
+
+
+    def record(self, name, seconds):
+        """Add a module loaded some other way, e.g. by the game plugin loader."""
+        self.times[name] = self.times.get(name, 0.0) + seconds
+
+
+    def report(self, top=8):
+        """One line with the time since the timer was created and the slowest imports."""
+        elapsed = time.perf_counter() - self.started
+        slowest = sorted(self.times.items(), key=lambda item: item[1], reverse=True)[:top]
+        imports = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in slowest)
+        return f"Started in {elapsed:.2f}s; imports: {imports}"
+
+
+# Created when bot.py starts, before anything heavy is imported
+IMPORT_TIMER = ImportTimer()
@@ -0,0 +1,147 @@
+import os
+import asyncio
+import sqlite3
+import threading
+
+from games.executor import run_blocking
+
+
+# Where scores are kept across restarts
+STATS_PATH = os.getenv('SGB_STATS_PATH', os.path.join('data', 'stats.db'))
+# Seconds points are collected in memory before they are written in one transaction
+STATS_FLUSH_INTERVAL = float(os.getenv('STATS_FLUSH_INTERVAL', '2'))
+
+# Topic the totals of a game are stored under, next to the per-topic rows
+TOTAL_TOPIC = ''
+
+
+def guild_id_of(channel):
+    """Guild the stats of a channel count towards; 0 for channels outside a guild."""
+    guild = getattr(channel, 'guild', None)
+    return guild.id if guild else 0
+
+
+class StatsStore:
+    """
+    All-time points, games played and wins per guild, user, game and topic,
+    stored in SQLite in WAL mode. Games record results without waiting: changes
+    are summed in memory and written in one transaction on a worker thread every
+    flush_interval seconds. Every change is also added to the game's total row
+    (topic TOTAL_TOPIC), so leaderboards are a single index range scan.
+    """
+    def __init__(self, path, flush_interval=2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending = {}  # (guild_id, game, topic, user_id) -> [points, games_played, wins]
+        self._flush_task = None
+        self._flush_lock = None  # Created on first use, inside the bot's event loop
+        self._connection = None
+        self._lock = threading.Lock()
+
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS stats ("
+                "guild_id INTEGER NOT NULL, game TEXT NOT NULL, topic TEXT NOT NULL, user_id INTEGER NOT NULL, "
+                "points INTEGER NOT NULL DEFAULT 0, games_played INTEGER NOT NULL DEFAULT 0, wins INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (guild_id, game, topic, user_id))"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS stats_leaderboard ON stats (guild_id, game, topic, points DESC)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS stats_user ON stats (guild_id, user_id)")
+            self._connection.commit()
+        return self._connection
+
+
+    def _add(self, guild_id, game, topic, user_id, points=0, games_played=0, wins=0):
+        topics = (TOTAL_TOPIC,) if topic == TOTAL_TOPIC else (TOTAL_TOPIC, topic)
+        for row_topic in topics:
+            totals = self._pending.setdefault((guild_id, game, row_topic, user_id), [0, 0, 0])
+            totals[0] += points
+            totals[1] += games_played
+            totals[2] += wins
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+
+    def record_point(self, guild_id, game, user_id, topic=TOTAL_TOPIC, points=1):
+        """Queue points scored by a user."""
+        self._add(guild_id, game, topic, user_id, points=points)
+
+
+    def record_game(self, guild_id, game, scores, topic=TOTAL_TOPIC):
+        """Queue a finished game: everyone played it and the top scorers (with any points) won it."""
+        best = max(scores.values(), default=0)
+        for user_id, score in scores.items():
+            self._add(guild_id, game, topic, user_id, games_played=1, wins=int(best > 0 and score == best))
+
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+
+    async def flush(self):
+        """Write every queued change now, after any write already in progress."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            rows = [(*key, *totals) for key, totals in batch.items()]
+            try:
+                await run_blocking(self._write, rows)
+            except Exception as e:
+                print(f"Error saving stats: {e!r}")
+
+
+    def _write(self, rows):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO stats (guild_id, game, topic, user_id, points, games_played, wins) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (guild_id, game, topic, user_id) DO UPDATE SET "
+                    "points = points + excluded.points, "
+                    "games_played = games_played + excluded.games_played, "
+                    "wins = wins + excluded.wins",
+                    rows,
+                )
+
+
+    def _query(self, sql, parameters):
+        with self._lock:
+            return self._connect().execute(sql, parameters).fetchall()
+
+
+    async def leaderboard(self, guild_id, game, topic=TOTAL_TOPIC, limit=10):
+        """All-time [(user_id, points)] of a game in a guild, highest first."""
+        await self.flush()
+        return await run_blocking(
+            self._query,
+            "SELECT user_id, points FROM stats WHERE guild_id = ? AND game = ? AND topic = ? "
+            "ORDER BY points DESC LIMIT ?",
+            (guild_id, game, topic, limit),
+        )
+
+
+    async def user_stats(self, guild_id, user_id):
+        """All-time [(game, topic, points, games_played, wins)] of a user in a guild."""
+        await self.flush()
+        return await run_blocking(
+            self._query,
+            "SELECT game, topic, points, games_played, wins FROM stats WHERE guild_id = ? AND user_id = ? "
+            "ORDER BY game, topic",
+            (guild_id, user_id),
+        )
+
+
+# The store every game records to
+STATS = StatsStore(STATS_PATH, STATS_FLUSH_INTERVAL)
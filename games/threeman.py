@@ -1,24 +1,42 @@
 import random
-import asyncio
 import discord
 from discord.ext import commands
 
+from games.outbox import channel_outbox, followup_outbox
+from games.scheduler import WHEEL
+from games.snapshots import SNAPSHOTS
+
+def mention(user_id):
+    return f"<@{user_id}>"
+
+
 class ThreeManGame:
-    def __init__(self, bot, channel, players):
+    name = 'threeman'
+    # Pauses in seconds, each can be overridden per game
+    DEFAULT_DELAYS = {
+        'roll': 2,  # Between /roll and the dice landing
+        'pass_turn': 2,  # Before the skipped Threeman's turn passes on
+        'open_threeman': 2,  # Before the Threeman position reopens
+    }
+
+    def __init__(self, bot, channel, players, delays=None):
         self.bot = bot
         self.channel = channel
-        self.players = list(players)
-        self.threeman = None
+        self.outbox = channel_outbox(channel)
+        self.players = [player.id for player in players]  # Turn order, by user ID
+        self.player_ids = set(self.players)
+        self.answer_keys = ()  # Threeman is played with /roll, never through chat
+        self.threeman = None  # User ID of the Threeman
         self.threeman_skipped = False
-        self.roller = None
+        self.roller = None  # User ID of the player whose turn it is
         self.started = False
+        self.finished = False
+        self.rolling = False  # A roll is waiting on the timer wheel
+        self.pending_timer = None
+        self.delays = {**self.DEFAULT_DELAYS, **(delays or {})}
         self.rules = self._initialize_rules()
 
 
-    def name(self):
-        return "Threeman"
-
-
     def _initialize_rules(self):
         """Initialize the list of rules."""
         return [
@@ -79,54 +97,54 @@ class ThreeManGame:
         """Rule: Threeman drinks for each 3 rolled."""
         drinks = [die for die in [die1, die2] if die == 3]
         if drinks:
-            await self.channel.send(f"The Threeman ({self.threeman}) drinks {len(drinks)} times!")
+            ctx.send(f"The Threeman ({mention(self.threeman)}) drinks {len(drinks)} times!")
 
 
     async def rule_double_ones(self, ctx, die1, die2, total):
         """Rule: Double ones."""
-        await self.channel.send(f"{self.roller} rolled double ones! Tell anyone to finish their drink.")
+        ctx.send(f"{mention(self.roller)} rolled double ones! Tell anyone to finish their drink.")
 
 
     async def rule_double_twos(self, ctx, die1, die2, total):
         """Rule: Double twos."""
-        await self.channel.send(f"{self.roller} rolled double twos! Give out 8 drinks.")
+        ctx.send(f"{mention(self.roller)} rolled double twos! Give out 8 drinks.")
 
 
     async def rule_double_threes(self, ctx, die1, die2, total):
         """Rule: Double threes."""
-        await self.channel.send(f"{self.roller} rolled double threes! Give out 6 drinks.")
+        ctx.send(f"{mention(self.roller)} rolled double threes! Give out 6 drinks.")
 
 
     async def rule_double_fours(self, ctx, die1, die2, total):
         """Rule: Double fours."""
-        await self.channel.send(f"{self.roller} rolled double fours! Give out 8 drinks.")
+        ctx.send(f"{mention(self.roller)} rolled double fours! Give out 8 drinks.")
 
 
     async def rule_double_fives(self, ctx, die1, die2, total):
         """Rule: Double fives."""
-        await self.channel.send(f"{self.roller} rolled double fives! Give out 10 drinks.")
+        ctx.send(f"{mention(self.roller)} rolled double fives! Give out 10 drinks.")
 
 
     async def rule_double_sixes(self, ctx, die1, die2, total):
         """Rule: Double sixes."""
-        await self.channel.send(f"{self.roller} rolled double sixes! Give out 12 drinks.")
+        ctx.send(f"{mention(self.roller)} rolled double sixes! Give out 12 drinks.")
 
 
     async def rule_everyone_drinks(self, ctx, die1, die2, total):
         """Rule: Everyone drinks."""
-        await self.channel.send("Everyone drinks!")
+        ctx.send("Everyone drinks!")
 
 
     async def rule_total_seven(self, ctx, die1, die2, total):
         """Rule: Total of 7."""
         index = (self.players.index(self.roller) - 1) % len(self.players)
-        await self.channel.send(f"Total of 7! {self.players[index]} drinks.")
+        ctx.send(f"Total of 7! {mention(self.players[index])} drinks.")
 
 
     async def rule_total_eleven(self, ctx, die1, die2, total):
         """Rule: Total of 11."""
         index = (self.players.index(self.roller) + 1) % len(self.players)
-        await self.channel.send(f"Total of 11! {self.players[index]} drinks.")
+        ctx.send(f"Total of 11! {mention(self.players[index])} drinks.")
 
 
     async def apply_rules(self, ctx, die1, die2, total):
@@ -146,100 +164,168 @@ class ThreeManGame:
             await interaction.response.send_message("The game has not started yet.", ephemeral=True)
             return
 
-        if interaction.user != self.roller:
+        if interaction.user.id != self.roller:
             await interaction.response.send_message(
-                f"It's not your turn, {interaction.user.mention}! Wait for {self.roller.mention} to roll.", ephemeral=True
+                f"It's not your turn, {interaction.user.mention}! Wait for {mention(self.roller)} to roll.", ephemeral=True
             )
             return
 
-        # Defer the interaction to prevent timeouts and allow multiple follow-up messages
+        if self.rolling:
+            await interaction.response.send_message("Your dice are already rolling!", ephemeral=True)
+            return
+
+        # Defer the interaction to prevent timeouts; follow-ups sent in the same tick are merged into one message
         await interaction.response.defer()
+        followups = followup_outbox(interaction)
+        self.rolling = True
 
         if self.threeman == self.roller and not self.threeman_skipped:
             # Skip the Threeman's turn once
             self.threeman_skipped = True
-            await interaction.followup.send(
-                f"{self.roller.mention} is the Threeman and gets skipped this round. Passing to the next player."
+            followups.send(
+                f"{mention(self.roller)} is the Threeman and gets skipped this round. Passing to the next player."
             )
+            self._schedule(self.delays['pass_turn'], self._pass_turn, followups)
+            return
 
-            # Add sleep to reduce jitter
-            await asyncio.sleep(2)
+        # Pause before the dice land to reduce jitter
+        self._schedule(self.delays['roll'], self._roll_dice, followups)
+
+
+    def _schedule(self, delay, callback, *args):
+        self.pending_timer = WHEEL.call_later(delay, callback, *args)
+
+
+    def to_snapshot(self):
+        """The state of the game between rolls, with players as user IDs."""
+        return {
+            'game': self.name,
+            'players': self.players,
+            'roller': self.roller,
+            'threeman': self.threeman,
+            'threeman_skipped': self.threeman_skipped,
+        }
+
+
+    @classmethod
+    def from_snapshot(cls, bot, channel, snapshot):
+        game = cls(bot, channel, [])
+        game.players = snapshot['players']
+        game.player_ids = set(game.players)
+        game.roller = snapshot['roller']
+        game.threeman = snapshot['threeman']
+        game.threeman_skipped = snapshot['threeman_skipped']
+        return game
 
-            current_index = self.players.index(self.roller)
-            next_index = (current_index + 1) % len(self.players)
-            self.roller = self.players[next_index]
-            await interaction.followup.send(f"It's now {self.roller.mention}'s turn!")
-            return
 
-        # Add sleep to reduce jitter
-        await asyncio.sleep(2)
+    def save_snapshot(self):
+        SNAPSHOTS.save(self.channel.id, self.to_snapshot())
 
+
+    async def resume(self):
+        """Carry on after a restart from the last snapshot; a roll that was in the air is rolled again."""
+        self.started = True
+        threeman = f"{mention(self.threeman)} is the Threeman" if self.threeman else "The threeman is open"
+        self.outbox.send(f"Resuming the game of Threeman after a restart. {threeman}. It's {mention(self.roller)}'s turn!")
+
+
+    def _pass_turn(self, followups):
+        self.rolling = False
+        current_index = self.players.index(self.roller)
+        next_index = (current_index + 1) % len(self.players)
+        self.roller = self.players[next_index]
+        self.save_snapshot()
+        followups.send(f"It's now {mention(self.roller)}'s turn!")
+
+
+    async def _roll_dice(self, followups):
+        self.rolling = False
         die1, die2 = random.randint(1, 6), random.randint(1, 6)
         total = die1 + die2
-        await interaction.followup.send(f"{self.roller.mention} rolled a {die1} and a {die2} (Total: {total}).")
+        followups.send(f"{mention(self.roller)} rolled a {die1} and a {die2} (Total: {total}).")
 
         if self.threeman is None:
             # Threeman is unassigned
             if 3 in [die1, die2, total]:
                 self.threeman = self.roller
-                await interaction.followup.send(f"{self.roller.mention} rolled a 3 and is now the Threeman! Drink up!")
+                followups.send(f"{mention(self.roller)} rolled a 3 and is now the Threeman! Drink up!")
                 # Move to the next player after assigning the Threeman
                 current_index = self.players.index(self.roller)
                 next_index = (current_index + 1) % len(self.players)
                 self.roller = self.players[next_index]
-                await interaction.followup.send(f"It's now {self.roller.mention}'s turn!")
+                self.save_snapshot()
+                followups.send(f"It's now {mention(self.roller)}'s turn!")
                 return
 
         if self.threeman == self.roller:
             # Threeman is rolling out
             if 3 in [die1, die2, total]:
-                await interaction.followup.send(
-                    f"{self.roller.mention} rolled a 3 and is no longer the Threeman! The position is now open."
+                followups.send(
+                    f"{mention(self.roller)} rolled a 3 and is no longer the Threeman! The position is now open."
                 )
-
-                # Add sleep to reduce jitter
-                await asyncio.sleep(2)
-
-                self.threeman = None
-                self.threeman_skipped = False  # Reset skip tracking
-                # Next player rolls for Threeman
-                current_index = self.players.index(self.roller)
-                next_index = (current_index + 1) % len(self.players)
-                self.roller = self.players[next_index]
-                await interaction.followup.send(f"The Threeman position is open! {self.roller.mention}, roll to claim it!")
+                # Nobody rolls until the position reopens
+                self.rolling = True
+                self._schedule(self.delays['open_threeman'], self._open_threeman, followups)
                 return
 
         # Apply rules for the current roll
-        if not await self.apply_rules(interaction, die1, die2, total):
-            await interaction.followup.send(f"No rule matched. {self.roller.mention}'s turn ends.")
+        if not await self.apply_rules(followups, die1, die2, total):
+            followups.send(f"No rule matched. {mention(self.roller)}'s turn ends.")
 
             # Move to the next player
             current_index = self.players.index(self.roller)
             next_index = (current_index + 1) % len(self.players)
             self.roller = self.players[next_index]
-            await interaction.followup.send(f"It's now {self.roller.mention}'s turn!")
+            self.save_snapshot()
+            followups.send(f"It's now {mention(self.roller)}'s turn!")
         else:
             # Inform the roller to roll again if rules matched
-            await interaction.followup.send(f"{self.roller.mention}, it's still your turn! Roll again with `/roll`.")
+            followups.send(f"{mention(self.roller)}, it's still your turn! Roll again with `/roll`.")
+
+
+    def _open_threeman(self, followups):
+        self.rolling = False
+        self.threeman = None
+        self.threeman_skipped = False  # Reset skip tracking
+        # Next player rolls for Threeman
+        current_index = self.players.index(self.roller)
+        next_index = (current_index + 1) % len(self.players)
+        self.roller = self.players[next_index]
+        self.save_snapshot()
+        followups.send(f"The Threeman position is open! {mention(self.roller)}, roll to claim it!")
 
 
     async def start_game(self):
         if len(self.players) < 2:
-            await self.channel.send("You need at least 2 players to start a game of Threeman.")
+            self.outbox.send("You need at least 2 players to start a game of Threeman.")
             return
 
         # Randomly select the first roller
         self.roller = random.choice(self.players)
         self.started = True
+        self.save_snapshot()
 
-        player_mentions = ", ".join(player.mention for player in self.players)
-        await self.channel.send(f"Starting a game of Threeman with players: {player_mentions}.")
-        await self.channel.send(f"{self.roller.mention} is the first roller! Roll the dice with `!roll`. The threeman is open.")
+        player_mentions = ", ".join(mention(player) for player in self.players)
+        self.outbox.send(f"Starting a game of Threeman with players: {player_mentions}.")
+        self.outbox.send(f"{mention(self.roller)} is the first roller! Roll the dice with `!roll`. The threeman is open.")
 
 
-    async def end_game(self):
+    def _stop(self):
         self.started = False
+        self.finished = True
         self.threeman = None
         self.roller = None
+        if self.pending_timer:
+            self.pending_timer.cancel()
+
+
+    async def stand_down(self):
+        """Stop running the game in this process without ending it, after another worker took it over."""
+        self._stop()
+
+
+    async def end_game(self):
+        self._stop()
+        SNAPSHOTS.discard(self.channel.id)
 
-        await self.channel.send("The game of Threeman has ended. Thanks for playing!")
+        self.outbox.send("The game of Threeman has ended. Thanks for playing!")
@@ -0,0 +1,170 @@
+import sys
+import json
+import html
+import random
+import threading
+from array import array
+
+from games.executor import run_blocking
+
+
+ALL_TOPICS = "all_topics"
+
+
+class QuestionBank:
+    """
+    Trivia questions stored one JSON object per line ({"topic", "question", "answer"}
+    and optionally a list of accepted "aliases"). A question's ID is its position
+    in the file. The file is only read the first time the bank is used, so large
+    banks do not slow down bot startup; the bot reads it in a worker thread with
+    load() once it is ready.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._loaded = False
+        self._questions = []
+        self._answers = []
+        self._aliases = {}  # Question ID -> alternative answers, only for questions that have them
+        self._topic_ids = array('H')  # Index into self._topic_names for every question
+        self._topic_names = []
+        self._by_topic = {}  # Topic name -> array of question IDs
+        self._lock = threading.Lock()
+
+
+    async def load(self):
+        """Read the file in a worker thread, unless it has been read already."""
+        if not self._loaded:
+            await run_blocking(self._load)
+
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+
+            questions, answers, aliases = [], [], {}
+            topic_ids, topic_names = array('H'), []
+            topic_index = {}
+            by_topic = {}
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    topic = record['topic']
+                    if topic not in topic_index:
+                        topic_index[topic] = len(topic_names)
+                        topic_names.append(topic)
+                        by_topic[topic] = array('I')
+
+                    question_id = len(questions)
+                    questions.append(record['question'])
+                    answers.append(record['answer'])
+                    if record.get('aliases'):
+                        aliases[question_id] = record['aliases']
+                    topic_ids.append(topic_index[topic])
+                    by_topic[topic].append(question_id)
+
+            # Published together once complete, so a reader never sees half a bank
+            self._questions, self._answers, self._aliases = questions, answers, aliases
+            self._topic_ids, self._topic_names, self._by_topic = topic_ids, topic_names, by_topic
+            self._loaded = True
+
+
+    def topics(self):
+        """List every topic name, including the combined all_topics pool."""
+        self._load()
+        return self._topic_names + [ALL_TOPICS]
+
+
+    def __contains__(self, topic):
+        self._load()
+        return topic == ALL_TOPICS or topic in self._by_topic
+
+
+    def __len__(self):
+        self._load()
+        return len(self._questions)
+
+
+    def question(self, question_id):
+        """Build the question dict for an ID."""
+        self._load()
+        return {
+            'id': question_id,
+            'topic': self._topic_names[self._topic_ids[question_id]],
+            'question': self._questions[question_id],
+            'answer': self._answers[question_id],
+            'aliases': self._aliases.get(question_id, []),
+        }
+
+
+    def deck(self, topic, seed=None, drawn=0):
+        """
+        Create a freshly shuffled deck of the questions in a topic, or rebuild a
+        saved one from its seed and the number of questions already drawn.
+        """
+        self._load()
+        if topic == ALL_TOPICS:
+            question_ids = array('I', range(len(self._questions)))
+        else:
+            question_ids = array('I', self._by_topic[topic])
+        return QuestionDeck(self, question_ids, seed, drawn)
+
+
+class QuestionDeck:
+    """
+    A shuffled permutation of question IDs. Drawing pops from the end, so every
+    round gets an unused question in O(1). The order follows from the seed, so
+    the seed and the number of drawn questions are enough to restore a deck.
+    """
+    def __init__(self, bank, question_ids, seed=None, drawn=0):
+        self.bank = bank
+        self.total = len(question_ids)
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self._order = question_ids
+        random.Random(self.seed).shuffle(self._order)
+        del self._order[max(0, len(self._order) - drawn):]
+
+
+    @property
+    def drawn(self):
+        return self.total - len(self._order)
+
+
+    def __len__(self):
+        return len(self._order)
+
+
+    def draw(self):
+        """Return the next unused question, or None when the deck is empty."""
+        if not self._order:
+            return None
+        return self.bank.question(self._order.pop())
+
+
+def import_opentdb(dump_path, bank_path):
+    """
+    Append the questions of an Open Trivia DB API dump ({"results": [...]}) to a
+    question bank file. Categories become topics.
+    """
+    with open(dump_path, encoding='utf-8') as f:
+        results = json.load(f)['results']
+
+    with open(bank_path, 'a', encoding='utf-8') as f:
+        for result in results:
+            topic = html.unescape(result['category']).split(':')[-1].strip().lower().replace(' ', '_')
+            record = {
+                'topic': topic,
+                'question': html.unescape(result['question']),
+                'answer': html.unescape(result['correct_answer']),
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return len(results)
+
+
+if __name__ == '__main__':
+    # Usage: python -m games.trivia.question_bank <opentdb_dump.json> <questions.jsonl>
+    count = import_opentdb(sys.argv[1], sys.argv[2])
+    print(f"Imported {count} questions into {sys.argv[2]}")
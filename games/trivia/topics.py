@@ -1,318 +1,9 @@
-TRIVIA_TOPICS = {
-    "cs": [
-        {"question": "What language is based on a snake?", "answer": "Python"},
-        {"question": "What language is based on a coffee bean?", "answer": "Java"},
-    ],
-    "minecraft": [
-        {"question": "What rare biome is home to towering mushrooms and Mooshrooms?", "answer": "Mushroom Fields"},
-        {"question": "What block can be used to brew potions?", "answer": "Brewing Stand"},
-        {"question": "Which mob drops Blaze Rods when defeated?", "answer": "Blaze"},
-        {"question": "What enchantment allows a player to walk on water by turning it into ice?", "answer": "Frost Walker"},
-        {"question": "What material is required to craft a Netherite Ingot?", "answer": "Ancient Debris"},
-        {"question": "What is the maximum number of levels a beacon can have?", "answer": "4"},
-        {"question": "Which block can be used to transport redstone signals vertically?", "answer": "Observer"},
-        {"question": "Which mob attacks in a group and can fly through walls?", "answer": "Phantom"},
-        {"question": "What is the name of the structure where you can find a Woodland Mansion?", "answer": "Dark Forest"},
-        {"question": "What block is immune to Ghast fireballs?", "answer": "Cobblestone"},
-        {"question": "What is the maximum enchantment level for Sharpness in survival?", "answer": "5"},
-        {"question": "What is the main ingredient in a potion of fire resistance?", "answer": "Magma Cream"},
-        {"question": "What tool is required to mine diamonds?", "answer": "Iron Pickaxe"},
-        {"question": "What is the name of the dimension filled with Endermen and an obsidian platform?", "answer": "The End"},
-        {"question": "What enchantment allows bows to shoot infinite arrows?", "answer": "Infinity"},
-        {"question": "What is the maximum number of items a single stack can hold for most items?", "answer": "64"},
-        {"question": "What enchantment increases mining speed underwater?", "answer": "Aqua Affinity"},
-        {"question": "Which mob can drop a totem of undying?", "answer": "Evoker"},
-        {"question": "What is the maximum level for the Fortune enchantment?", "answer": "3"},
-        {"question": "What block can be used to attract lightning?", "answer": "Lightning Rod"},
-        {"question": "What is the name of the boss mob found in an underwater temple?", "answer": "Elder Guardian"},
-        {"question": "Which block allows you to smelt ores twice as fast?", "answer": "Blast Furnace"},
-        {"question": "Which item allows Elytra to be repaired?", "answer": "Phantom Membrane"},
-        {"question": "What biome is known for its greenish-blue grass and trees?", "answer": "Swamp"},
-        {"question": "What is the primary use of Lapis Lazuli?", "answer": "Enchanting items"},
-        {"question": "Which mob can drop a Saddle when defeated?", "answer": "Strider"},
-        {"question": "What is the maximum range of a beacon?", "answer": "50 blocks"},
-        {"question": "What block emits a redstone signal based on the fullness of its inventory?", "answer": "Comparator"},
-        {"question": "What is the fastest way to travel in the Nether?", "answer": "Ice Boat"},
-        {"question": "What tool do you need to mine sponges quickly?", "answer": "Hoe"},
-        {"question": "What is the name of the flower that gives a light blue dye?", "answer": "Blue Orchid"},
-        {"question": "What block is required to grow Nether Wart?", "answer": "Soul Sand"},
-        {"question": "What item is needed to make a Dispenser?", "answer": "Bow"},
-        {"question": "What is the block that villagers use as a job site for clerics?", "answer": "Brewing Stand"},
-        {"question": "What block is used to enchant items?", "answer": "Enchanting Table"},
-        {"question": "What is the function of a Loom?", "answer": "Crafting banners"},
-        {"question": "What is the name of the enchantment that increases attack damage to spiders?", "answer": "Bane of Arthropods"},
-        {"question": "Which mob can teleport?", "answer": "Enderman"},
-        {"question": "What is the rarest naturally occurring ore?", "answer": "Emerald Ore"},
-        {"question": "What block is used to create the Wither Boss?", "answer": "Soul Sand"},
-        {"question": "What item is needed to craft a Piston?", "answer": "Redstone"},
-        {"question": "What is the name of the biome with red and orange sand and terracotta?", "answer": "Badlands"},
-        {"question": "Which item is required to respawn the Ender Dragon?", "answer": "End Crystal"},
-        {"question": "What is the maximum level for the Looting enchantment?", "answer": "3"},
-        {"question": "What block is created when water touches lava in a vertical flow?", "answer": "Obsidian"},
-        {"question": "What is the main ingredient in a potion of invisibility?", "answer": "Golden Carrot"},
-        {"question": "What is the name of the structure found in the End filled with Shulkers?", "answer": "End City"},
-        {"question": "What tool is used to carve pumpkins?", "answer": "Shears"},
-        {"question": "Which block can be used to craft red dye?", "answer": "Poppy"},
-        {"question": "What item is needed to craft an Enchanting Table?", "answer": "Obsidian"},
-        {"question": "What mob is neutral but becomes hostile if you attack it or mine gold?", "answer": "Piglin"},
-        {"question": "Which mob is immune to fire damage?", "answer": "Strider"},
-        {"question": "What enchantment allows you to breathe underwater for longer?", "answer": "Respiration"},
-        {"question": "What is the function of a Stonecutter?", "answer": "Cuts stone into slabs, stairs, or other variants"},
-        {"question": "What is the name of the food item that can poison the player?", "answer": "Pufferfish"},
-        {"question": "What is the name of the structure that generates in the ocean and contains Elder Guardians?", "answer": "Ocean Monument"},
-        {"question": "What is required to craft a shield?", "answer": "Wood and Iron Ingot"},
-        {"question": "What block prevents mobs from spawning in its area?", "answer": "Light Block"},
-        {"question": "What item can be used to move bees to a new hive?", "answer": "Leash"},
-        {"question": "What is the name of the effect that causes hearts to regenerate faster?", "answer": "Regeneration"},
-        {"question": "What block is needed to summon the Ender Dragon again?", "answer": "End Crystal"},
-        {"question": "What item can be smelted into Green Dye?", "answer": "Cactus"},
-        {"question": "Which mob can hold a trident?", "answer": "Drowned"},
-        {"question": "What tool is required to mine sponges quickly?", "answer": "Hoe"},
-        {"question": "What block is required to grow Nether Wart?", "answer": "Soul Sand"},
-        {"question": "What item is needed to make a Dispenser?", "answer": "Bow"},
-        {"question": "What block is used to enchant items?", "answer": "Enchanting Table"},
-    ],
-    "LoL": [
-        {"question": "Which item grants +80 Attack Damage and a unique passive that deals bonus physical damage on-hit equal to 12% of the target's maximum health?", "answer": "Blade of the Ruined King"},
-        {"question": "What item provides +80 Attack Damage and a unique passive that heals for 15% of damage dealt, converting healing beyond maximum health into a shield?", "answer": "Bloodthirster"},
-        {"question": "Which champion is known as 'The Sinister Blade'?", "answer": "Katarina"},
-        {"question": "What is the name of the dragon that grants bonus attack damage and ability power when slain?", "answer": "Infernal Drake"},
-        {"question": "Which summoner spell provides a brief burst of speed and ghosting?", "answer": "Ghost"},
-        {"question": "What is the maximum level a champion can reach in League of Legends?", "answer": "18"},
-        {"question": "What is the title of the champion Yasuo?", "answer": "The Unforgiven"},
-        {"question": "Which champion's passive is called 'Second Wind'?", "answer": "Aatrox"},
-        {"question": "What is the name of the map used in professional League of Legends matches?", "answer": "Summoner's Rift"},
-        {"question": "Which item grants a spell shield that blocks one enemy ability?", "answer": "Banshee's Veil"},
-        {"question": "What champion is known as 'The Blind Monk'?", "answer": "Lee Sin"},
-        {"question": "What is the cooldown reduction cap in League of Legends?", "answer": "40%"},
-        {"question": "What champion's ultimate ability is called 'Death Mark'?", "answer": "Zed"},
-        {"question": "Which champion's passive grants him bonus movement speed when near low-health enemies?", "answer": "Singed"},
-        {"question": "Which champion is known as 'The Frost Archer'?", "answer": "Ashe"},
-        {"question": "What is the maximum number of wards a player can place simultaneously?", "answer": "3"},
-        {"question": "What is the name of the dragon that grants bonus movement speed when killed?", "answer": "Cloud Drake"},
-        {"question": "Which item grants +80 Ability Power and increases magic penetration?", "answer": "Void Staff"},
-        {"question": "Which champion's ability is called 'Decimating Smash'?", "answer": "Sion"},
-        {"question": "What is the name of the Keystone rune that deals bonus damage when damaging an enemy champion with three separate attacks?", "answer": "Press the Attack"},
-        {"question": "Which item is built from 'Sheen' and 'Phage'?", "answer": "Trinity Force"},
-        {"question": "What champion's ultimate is called 'Moonlight Vigil'?", "answer": "Aphelios"},
-        {"question": "What champion is known as 'The Heart of the Freljord'?", "answer": "Braum"},
-        {"question": "Which champion's passive is called 'Crimson Pact'?", "answer": "Vladimir"},
-        {"question": "What is the name of the spell that deals true damage and reduces enemy healing?", "answer": "Ignite"},
-        {"question": "Which champion's ultimate is called 'Nature's Grasp'?", "answer": "Maokai"},
-        {"question": "What champion is known as 'The Void Walker'?", "answer": "Kassadin"},
-        {"question": "What is the respawn timer of jungle camps in League of Legends?", "answer": "2 minutes"},
-        {"question": "What is the cooldown for 'Flash' summoner spell?", "answer": "5 minutes"},
-        {"question": "Which champion is known as 'The Spear of Vengeance'?", "answer": "Kalista"},
-        {"question": "Which rune grants bonus attack speed and damage after staying in combat?", "answer": "Lethal Tempo"},
-        {"question": "Which champion is known as 'The Mad Chemist'?", "answer": "Singed"},
-        {"question": "What is the name of the small, healing jungle plant?", "answer": "Honeyfruit"},
-        {"question": "What is the name of the neutral monster that grants mana regeneration?", "answer": "Blue Buff"},
-        {"question": "What champion's ultimate is called 'Final Spark'?", "answer": "Lux"},
-        {"question": "Which champion is known as 'The Tidal Trickster'?", "answer": "Fizz"},
-        {"question": "Which champion's passive is called 'Rage Gene'?", "answer": "Gnar"},
-        {"question": "What is the name of the dragon that grants bonus armor and magic resist?", "answer": "Mountain Drake"},
-        {"question": "Which champion is known as 'The Sheriff of Piltover'?", "answer": "Caitlyn"},
-        {"question": "What champion's passive ability is called 'Frost Shot'?", "answer": "Ashe"},
-        {"question": "What champion's ultimate is called 'Realm Warp'?", "answer": "Ryze"},
-        {"question": "What is the name of the structure that spawns super minions?", "answer": "Inhibitor"},
-        {"question": "Which champion is known as 'The Monkey King'?", "answer": "Wukong"},
-        {"question": "What champion's passive is called 'Vampiric Blade'?", "answer": "Aatrox"},
-        {"question": "What is the name of the ability that stuns from Twisted Fate?", "answer": "Gold Card"},
-        {"question": "What is the maximum gold gained per turret plating destroyed?", "answer": "160"},
-        {"question": "What champion is known as 'The Minotaur'?", "answer": "Alistar"},
-        {"question": "Which champion's ultimate ability is 'Crowstorm'?", "answer": "Fiddlesticks"},
-        {"question": "What is the gold cost of a 'Control Ward'?", "answer": "75"},
-        {"question": "What champion is known as 'The Shadow Reaper'?", "answer": "Kayn"},
-        {"question": "What is the max number of charges for Corrupting Potion?", "answer": "3"}
-    ],
-    "alcohol": [
-        {"question": "What is the primary ingredient in beer?", "answer": "Barley"},
-        {"question": "What type of alcohol is used in a Bloody Mary?", "answer": "Vodka"},
-        {"question": "What is the name of the process by which alcohol is produced in beer and wine?", "answer": "Fermentation"},
-        {"question": "What country is known for its production of Scotch whisky?", "answer": "Scotland"},
-        {"question": "What type of alcohol is made from juniper berries?", "answer": "Gin"},
-        {"question": "What is the traditional glass used to serve champagne?", "answer": "Flute"},
-        {"question": "What is the name of the cocktail made with rum, mint, lime, sugar, and soda water?", "answer": "Mojito"},
-        {"question": "What is the term for a wine with no residual sugar?", "answer": "Dry"},
-        {"question": "What spirit is used to make a Margarita?", "answer": "Tequila"},
-        {"question": "What is the name of the beer traditionally brewed in Germany during Oktoberfest?", "answer": "Marzen"},
-        {"question": "What type of liquor is traditionally used in an Old Fashioned cocktail?", "answer": "Bourbon"},
-        {"question": "What fruit is used to produce cider?", "answer": "Apple"},
-        {"question": "What is the term for the alcohol content in a beverage, expressed as a percentage?", "answer": "ABV"},
-        {"question": "What is the name of the fermented rice drink popular in Japan?", "answer": "Sake"},
-        {"question": "What is the name of the process used to age whiskey in barrels?", "answer": "Maturation"},
-        {"question": "What type of wine is made from red grapes but has a pale pink color?", "answer": "Rosé"},
-        {"question": "What is the main flavoring ingredient in an Amaretto liqueur?", "answer": "Almond"},
-        {"question": "What country is known for its production of tequila?", "answer": "Mexico"},
-        {"question": "What type of alcohol is Baileys Irish Cream?", "answer": "Liqueur"},
-        {"question": "What is the name of the clear, distilled spirit commonly associated with Russia?", "answer": "Vodka"}
-    ],
-    "basic_math": [
-        {"question": "What is 5 + 3?", "answer": "8"},
-        {"question": "What is the product of 6 and 7?", "answer": "42"},
-        {"question": "What is the square root of 64?", "answer": "8"},
-        {"question": "What is 15 divided by 3?", "answer": "5"},
-        {"question": "What is 9 squared?", "answer": "81"},
-        {"question": "What is the sum of 12 and 14?", "answer": "26"},
-        {"question": "What is the difference between 50 and 30?", "answer": "20"},
-        {"question": "What is the value of 10% of 200?", "answer": "20"},
-        {"question": "What is the result of 8 x 12?", "answer": "96"},
-        {"question": "What is the perimeter of a square with side length 4?", "answer": "16"},
-        {"question": "What is the area of a rectangle with length 5 and width 3?", "answer": "15"},
-        {"question": "What is the result of 3 cubed?", "answer": "27"},
-        {"question": "What is 100 minus 45?", "answer": "55"},
-        {"question": "What is half of 64?", "answer": "32"},
-        {"question": "What is the least common multiple (LCM) of 4 and 6?", "answer": "12"},
-        {"question": "What is the greatest common divisor (GCD) of 24 and 36?", "answer": "12"},
-        {"question": "What is the result of 25% of 80?", "answer": "20"},
-        {"question": "What is the decimal form of 1/4?", "answer": "0.25"},
-        {"question": "What is the next prime number after 7?", "answer": "11"},
-        {"question": "What is the result of 0.5 x 100?", "answer": "50"}
-    ],
-    "brainrot": [
-        {"question": "What term refers to charisma or the ability to attract females?", "answer": "Rizz"},
-        {"question": "What term is used to refer to an attractive person's large posterior and can also represent shock?", "answer": "Gyatt"},
-        {"question": "What exercise is believed to improve your jawline?", "answer": "Mewing"},
-        {"question": "What is the process of improving one's appearance called?", "answer": "Looksmaxxing"},
-        {"question": "What term describes looking better than someone else?", "answer": "Mogging"},
-        {"question": "What term refers to a very successful, masculine, and independent man with little interest in others' emotions?", "answer": "Sigma"},
-        {"question": "What is the name of the series featuring '_________ Toilet'?", "answer": "Skibidi"},
-        {"question": "What recent party has been trending on TikTok's 'For You' page?", "answer": "TikTok Rizz Party"},
-        {"question": "What term describes stopping just before finishing an activity?", "answer": "Edging"},
-        {"question": "Which U.S. state is often referred to as the weirdest?", "answer": "Ohio"},
-        {"question": "Who is known for taxing food?", "answer": "Fanum"},
-        {"question": "Which lawyer is notorious for releasing supervillains?", "answer": "Jayoma"},
-        {"question": "Who is the group leader of the TikTok Rizz Party?", "answer": "Blue Tie"},
-        {"question": "Who got a low taper fade?", "answer": "Ninja"},
-        {"question": "What is considered the most dangerous school?", "answer": "Miller Grove"},
-        {"question": "Who 'Rizzed' Livvy Dunne?", "answer": "Baby Gronk"},
-        {"question": "What is the term '_________ Quandale Dingle' referring to?", "answer": "Turkish"},
-        {"question": "What song was played at the TikTok Rizz Party?", "answer": "Carnival"},
-        {"question": "What is the human equivalent (in size) to a black hole?", "answer": "Caseoh"},
-        {"question": "What slang term is used to address men, equivalent to 'bro'?", "answer": "Blud"},
-        {"question": "What term refers to a very basic and normal person with no unique personality?", "answer": "Beta"},
-        {"question": "What term describes someone talking too much nonsense?", "answer": "Yapping"},
-        {"question": "What is the name of the drink from the trend where people supposedly faint after drinking it?", "answer": "Grimace Shake"},
-        {"question": "What term describes someone who lacks emotion or personality and can be found anywhere, including video games?", "answer": "NPC"},
-        {"question": "What is another term for the person described as an 'NPC'?", "answer": "Bot"},
-        {"question": "Who is 'John ________' that is calling?", "answer": "Pork"},
-        {"question": "Complete the phrase: 'Sticking out your gyatt for the ________'", "answer": "Rizzler"},
-        {"question": "Which Twitch streamer is often revered as the epitome of man, known for being 6'4\" and playing basketball?", "answer": "Duke Dennis"},
-        {"question": "Which Twitch streamer is recently famous for being friendzoned by South African artist Tyla?", "answer": "Kai Cenat"},
-        {"question": "Which streamer is famous for his love for Cristiano Ronaldo?", "answer": "Speed"},
-        {"question": "Which streamer is known for his incredibly low basketball IQ and peaks in performance in June?", "answer": "Flight"},
-        {"question": "Which streamer is a massive NFL fan, especially of the Houston Texans, and is famous for saying 'What's up brother'?", "answer": "Sketch"},
-        {"question": "Which streamer pulled Breckie Hill?", "answer": "Jynxzi"},
-        {"question": "What term describes someone considered a 'Lone Wolf'?", "answer": "Alpha"},
-        {"question": "Who is the enemy of Skibidi Toilet?", "answer": "Cameraman"},
-        {"question": "What exercise is intended to extend one's 'meat/wood'?", "answer": "Jelqing"},
-        {"question": "On what day was TikTok filled with slideshows of explicit adult content?", "answer": "December 22"}
-    ],
-    "general": [
-        {"question": "What is the capital of Germany?", "answer": "Berlin"},
-        {"question": "What is the chemical symbol for gold?", "answer": "Au"},
-        {"question": "Who painted the Mona Lisa?", "answer": "Leonardo da Vinci"},
-        {"question": "What is the smallest prime number?", "answer": "2"},
-        {"question": "What is the largest desert in the world?", "answer": "Sahara Desert"},
-        {"question": "Which planet is known as the Red Planet?", "answer": "Mars"},
-        {"question": "Who wrote 'Romeo and Juliet'?", "answer": "William Shakespeare"},
-        {"question": "What is the powerhouse of the cell?", "answer": "Mitochondria"},
-        {"question": "How many continents are there on Earth?", "answer": "7"},
-        {"question": "Who was the first President of the United States?", "answer": "George Washington"},
-        {"question": "Which element has the atomic number 1?", "answer": "Hydrogen"},
-        {"question": "What is the longest river in the world?", "answer": "Nile River"},
-        {"question": "Who discovered gravity when he saw a falling apple?", "answer": "Isaac Newton"},
-        {"question": "What is the largest mammal on Earth?", "answer": "Blue Whale"},
-        {"question": "Which war was fought between the North and South regions of the United States?", "answer": "Civil War"},
-        {"question": "What is the most abundant gas in Earth's atmosphere?", "answer": "Nitrogen"},
-        {"question": "What year did World War II end?", "answer": "1945"},
-        {"question": "What is the capital city of Japan?", "answer": "Tokyo"},
-        {"question": "What is the capital city of Italy?", "answer": "Rome"},
-        {"question": "Which organ in the human body is responsible for pumping blood?", "answer": "Heart"},
-        {"question": "What is the largest ocean on Earth?", "answer": "Pacific Ocean"},
-        {"question": "What is the hardest natural substance on Earth?", "answer": "Diamond"},
-        {"question": "Who was the inventor of the light bulb?", "answer": "Thomas Edison"},
-        {"question": "What is the name of the largest moon of Saturn?", "answer": "Titan"},
-        {"question": "Which country gifted the Statue of Liberty to the United States?", "answer": "France"},
-        {"question": "What is the chemical symbol for water?", "answer": "H2O"},
-        {"question": "How many bones are there in the adult human body?", "answer": "206"},
-        {"question": "What year did man first land on the moon?", "answer": "1969"},
-        {"question": "What is the most populous country in the world?", "answer": "China"},
-        {"question": "Who is the author of '1984'?", "answer": "George Orwell"},
-        {"question": "What is the capital city of Canada?", "answer": "Ottawa"},
-        {"question": "What is the main gas found in the air we breathe?", "answer": "Nitrogen"},
-        {"question": "Which planet is closest to the Sun?", "answer": "Mercury"},
-        {"question": "Who painted the ceiling of the Sistine Chapel?", "answer": "Michelangelo"},
-        {"question": "What is the chemical formula for table salt?", "answer": "NaCl"},
-        {"question": "What is the tallest mountain in the world?", "answer": "Mount Everest"},
-        {"question": "What is the freezing point of water in Fahrenheit?", "answer": "32"},
-        {"question": "Who was the first woman to win a Nobel Prize?", "answer": "Marie Curie"},
-        {"question": "Which Shakespeare play features the characters of Rosencrantz and Guildenstern?", "answer": "Hamlet"},
-        {"question": "What is the smallest country in the world?", "answer": "Vatican City"},
-        {"question": "What is the main ingredient in guacamole?", "answer": "Avocado"},
-        {"question": "Which planet has the most moons?", "answer": "Saturn"},
-        {"question": "What is the boiling point of water in Celsius?", "answer": "100"},
-        {"question": "What is the longest bone in the human body?", "answer": "Femur"},
-        {"question": "Who developed the theory of relativity?", "answer": "Albert Einstein"},
-        {"question": "What is the largest land animal?", "answer": "African Elephant"},
-        {"question": "Which country is known as the Land of the Rising Sun?", "answer": "Japan"},
-        {"question": "What is the primary language spoken in Brazil?", "answer": "Portuguese"},
-        {"question": "Who is known as the Father of Computers?", "answer": "Charles Babbage"}
-    ],
-    "gaming": [
-        {"question": "What is the name of the protagonist in The Legend of Zelda series?", "answer": "Link"},
-        {"question": "Which company created the video game series Halo?", "answer": "Bungie"},
-        {"question": "What is the highest-selling video game of all time?", "answer": "Minecraft"},
-        {"question": "What year was the original PlayStation released?", "answer": "1994"},
-        {"question": "In which game do players compete in a battle royale on the island of Erangel?", "answer": "PUBG"},
-        {"question": "What is the name of the main antagonist in the Half-Life series?", "answer": "G-Man"},
-        {"question": "Which video game franchise features races involving blue shells and bananas?", "answer": "Mario Kart"},
-        {"question": "What is the name of the iconic weapon in the Halo series?", "answer": "Energy Sword"},
-        {"question": "Which game is set in the city of Los Santos?", "answer": "GTAV"},
-        {"question": "What is the term for gaining experience points in role-playing games?", "answer": "Leveling up"},
-        {"question": "Which video game series features the character Master Chief?", "answer": "Halo"},
-        {"question": "What is the name of the princess who needs saving in Super Mario Bros.?", "answer": "Princess Peach"},
-        {"question": "Which game studio created The Witcher series?", "answer": "CD Projekt Red"},
-        {"question": "What year was the video game Tetris originally released?", "answer": "1984"},
-        {"question": "Which game features the line 'The cake is a lie'?", "answer": "Portal"},
-        {"question": "What is the name of the assassin in the Assassin's Creed series?", "answer": "Ezio Auditore"},
-        {"question": "What is the name of the Spartan program in the Halo series?", "answer": "SPARTAN-II"},
-        {"question": "Which company is responsible for the Pokémon franchise?", "answer": "Nintendo"},
-        {"question": "What is the name of the blue hedgehog in Sega's video game series?", "answer": "Sonic"},
-        {"question": "Which game is known for its phrase 'Do a barrel roll'?", "answer": "Star Fox 64"},
-        {"question": "What is the main currency in the game The Legend of Zelda?", "answer": "Rupees"},
-        {"question": "What is the name of the fungal infection in The Last of Us?", "answer": "Cordyceps"},
-        {"question": "Which game features the character Solid Snake?", "answer": "Metal Gear Solid"},
-        {"question": "What is the name of the online game where players build and destroy blocks in a 3D environment?", "answer": "Minecraft"},
-        {"question": "What is the name of the character who collects rings in his adventures?", "answer": "Sonic"},
-        {"question": "Which game features the famous quote 'War. War never changes.'?", "answer": "Fallout"},
-        {"question": "What is the name of the bounty hunter in the Metroid series?", "answer": "Samus Aran"},
-        {"question": "In what game do players fight off waves of zombies while fortifying their base?", "answer": "Call of Duty Zombies"},
-        {"question": "What is the main questline goal in Skyrim?", "answer": "Defeat Alduin, the World-Eater"},
-        {"question": "Which game features a battle royale mode called Warzone?", "answer": "Call of Duty"},
-        {"question": "What is the name of the multiplayer online battle arena game developed by Riot Games?", "answer": "League of Legends"},
-        {"question": "In which game do players explore the galaxy as Commander Shepard?", "answer": "Mass Effect"},
-        {"question": "What game features the location 'Rapture,' an underwater city?", "answer": "BioShock"},
-        {"question": "Who is the main protagonist in the Uncharted series?", "answer": "Nathan Drake"},
-        {"question": "Which game features a character named Geralt of Rivia?", "answer": "The Witcher"},
-        {"question": "In what game do players craft tools and build shelters to survive?", "answer": "Minecraft"},
-        {"question": "Which game is set in a dystopian world with a character named Ellie?", "answer": "The Last of Us"},
-        {"question": "What is the main weapon used by Link in The Legend of Zelda?", "answer": "Master Sword"},
-        {"question": "Which game features the location of Vice City?", "answer": "Grand Theft Auto: Vice City"},
-        {"question": "What game involves capturing creatures to battle others?", "answer": "Pokémon"},
-        {"question": "Who is the main antagonist in the Far Cry 3 game?", "answer": "Vaas Montenegro"},
-        {"question": "Which game features a pink puffball as its main character?", "answer": "Kirby"},
-        {"question": "What is the name of the sci-fi horror game series featuring the character Isaac Clarke?", "answer": "Dead Space"},
-        {"question": "Which game includes the multiplayer mode 'Splatoon'?", "answer": "Splatoon"},
-        {"question": "In what game do players defend against Creepers?", "answer": "Minecraft"},
-        {"question": "Which game features the phrase 'Finish Him!'?", "answer": "Mortal Kombat"}
-    ],
-    "all_topics": [],  # Placeholder; will be populated dynamically if all_topics is selected
-}
+import os
 
-# Populate "all_topics" with questions from all other topics
-for topic, questions in TRIVIA_TOPICS.items():
-    if topic != "all_topics":
-        for question in questions:
-            question['topic'] = topic
-        TRIVIA_TOPICS["all_topics"].extend(questions)
\ No newline at end of file
+from games.trivia.question_bank import QuestionBank
+
+
+# The questions themselves live in questions.jsonl, one JSON object per line
+QUESTIONS_PATH = os.getenv('TRIVIA_QUESTIONS_PATH', os.path.join(os.path.dirname(__file__), 'questions.jsonl'))
+
+TRIVIA_TOPICS = QuestionBank(QUESTIONS_PATH)
@@ -1,43 +1,68 @@
-import random
-import asyncio
+from games.answer_matching import AnswerKey, normalize, find_match, hint_for
+from games.outbox import channel_outbox
+from games.scheduler import WHEEL
+from games.stats import STATS, TOTAL_TOPIC, guild_id_of
+from games.snapshots import SNAPSHOTS
+from games.metrics import TimedLock
 
 class TriviaGame:
-    def __init__(self, bot, channel, players, topic, questions):
+    name = 'trivia'
+    # Pauses in seconds, each can be overridden per game
+    DEFAULT_DELAYS = {
+        'start': 5,  # Before the first question
+        'between_questions': 4,
+        'after_leaderboard': 8,
+        'countdown': 2,  # Between "Next question coming up..." and the question
+        'answer_time': 45,  # Before an unanswered question is revealed
+    }
+    # Fractions of the answer time after which a hint is given
+    HINT_STAGES = (0.5, 0.75)
+    # Unanswered questions in a row after which the game ends itself
+    MAX_IDLE_ROUNDS = 3
+
+    def __init__(self, bot, channel, players, topic, deck, delays=None):
         self.bot = bot
         self.channel = channel
-        self.players = players
+        self.outbox = channel_outbox(channel)  # Messages queued together are sent as one
+        self.player_ids = {player.id for player in players}
         self.topic = topic
-        self.questions = questions
-        self.used_questions = set()
-        self.scores = {player: 0 for player in players}
+        self.deck = deck  # Shuffled QuestionDeck, drawn from once per question
+        self.scores = {player.id: 0 for player in players}
+        self.guild_id = guild_id_of(channel)
         self.current_question = None
+        self.answer_keys = []  # AnswerKey accepted for the current question, if one is active
         self.question_counter = 0
-        self.lock = asyncio.Lock()
+        self.lock = TimedLock(self.name)
+        self.delays = {**self.DEFAULT_DELAYS, **(delays or {})}
+        self.round_timer = None  # Pending hint, timeout or round transition on the timer wheel
+        self.hint_stage = 0
+        self.idle_rounds = 0
         self.question_active = False 
+        self.finished = False
 
     async def start_game(self):
-        await self.channel.send("Starting trivia game in 5 seconds!")
-        await asyncio.sleep(5)
-        await self.ask_question()
+        self.save_snapshot()
+        self.outbox.send(f"Starting trivia game in {self.delays['start']} seconds!")
+        self._schedule(self.delays['start'], self._next_question)
 
     async def ask_question(self):
-        # Case when all questions have been asked
-        if len(self.used_questions) == len(self.questions):
-            await self.channel.send("All questions have been asked! The game is over.")
-            await self.display_leaderboard(final=True)
-            return
+        # Draw the next unused question
+        question = self.deck.draw()
 
-        # Select a random question that hasn't been asked
-        available_questions = [q for q in self.questions if q['question'] not in self.used_questions]
-        if not available_questions:
-            await self.channel.send("All questions have been asked! The game is over.")
+        # Case when all questions have been asked
+        if question is None:
+            self.finished = True
+            self.outbox.send("All questions have been asked! The game is over.")
+            self._record_game()
+            SNAPSHOTS.discard(self.channel.id)
             await self.display_leaderboard(final=True)
             return
 
-        self.current_question = random.choice(available_questions)
-        self.used_questions.add(self.current_question['question'])  # Mark this question as used
+        self.current_question = question
         self.question_counter += 1
+        self.answer_keys = [AnswerKey(question['answer'], question['aliases'])]
         self.question_active = True  # Allow players to answer
+        self.save_snapshot()
 
         # Prepend the topic in bold if 'all_topics' is selected
         if self.topic == "all_topics":
@@ -45,35 +70,40 @@ class TriviaGame:
         else:
             question_text = self.current_question['question']
 
-        await self.channel.send(f"Question {self.question_counter}: {question_text}")
+        self.outbox.send(f"Question {self.question_counter}: {question_text}")
 
-    async def handle_answer(self, message):
+        # Start the clock for hints and the reveal
+        self.hint_stage = 0
+        self._schedule_round_deadline()
+
+    async def handle_answer(self, message, answer_key=None):
         """
-        Checks if a user's message matches the correct answer.
+        Checks if a user's message matches the correct answer. answer_key is the
+        key the message was already matched to, e.g. by the match pool.
         """
         async with self.lock:  # Prevent race conditions with multiple answers
             if not self.current_question or not self.question_active:
                 return  # No question is active or question has been answered
 
-            correct_answer = self.current_question['answer'].strip().lower()
-            if message.content.strip().lower() == correct_answer and message.author in self.players:
-                self.scores[message.author] += 1
+            if answer_key is None:
+                answer_key = find_match(self.answer_keys, normalize(message.content))
+            # A key matched before the lock was taken only counts while its question is still open
+            if message.author.id in self.player_ids and answer_key is not None and answer_key in self.answer_keys:
+                self.scores[message.author.id] += 1
+                STATS.record_point(self.guild_id, self.name, message.author.id, topic=self.current_question['topic'])
                 self.question_active = False  # Disable further answers for this question
-                await self.channel.send(f"{message.author.mention} answered correctly and earns a point!")
+                self.answer_keys = []
+                self.idle_rounds = 0
+                self.save_snapshot()
+                self.outbox.send(f"{message.author.mention} answered correctly and earns a point!")
 
                 # Every 5 questions, show the leaderboard
-                if self.question_counter % 5 == 0:
+                show_leaderboard = self.question_counter % 5 == 0
+                if show_leaderboard:
                     await self.display_leaderboard()
-                    await asyncio.sleep(8)  # Longer delay after leaderboard
-                    await self.channel.send("Next question coming up...")
-                    await asyncio.sleep(2)
-                else:
-                    await asyncio.sleep(4)  # Shorter delay between regular questions
-                    await self.channel.send("Next question coming up...")
-                    await asyncio.sleep(2)
-
 
-                await self.ask_question()  # Ask the next question
+                # Queue the next question instead of waiting for it while holding the lock
+                self._schedule_next_question(after_leaderboard=show_leaderboard)
 
     async def idk(self):
         """
@@ -82,19 +112,111 @@ class TriviaGame:
         async with self.lock:  # Locking to ensure only one action is processed
             # Check if the question is active
             if not self.current_question or not self.question_active:
-                await self.channel.send("No active question to skip.")
+                self.outbox.send("No active question to skip.")
                 return
 
             # Reveal the answer and disable the current question
-            self.question_active = False  # Disable further actions for this question
-            answer = self.current_question['answer']
-            await self.channel.send(f"The correct answer was: **{answer}**. Nobody earns a point.")
-
-            # Delay before moving to the next question
-            await asyncio.sleep(4)
-            # Add a chat countdown before the next question
-            await self.channel.send("Next question coming up...")
-            await asyncio.sleep(2)
+            self.idle_rounds = 0
+            self._reveal_answer("The correct answer was")
+            self._schedule_next_question()
+
+    def _reveal_answer(self, intro):
+        self.question_active = False  # Disable further actions for this question
+        self.answer_keys = []
+        answer = self.current_question['answer']
+        self.outbox.send(f"{intro}: **{answer}**. Nobody earns a point.")
+        self.save_snapshot()
+
+    def to_snapshot(self):
+        """
+        The state of the game between questions, with players as user IDs. A
+        question that is still open is put back into the deck, so it is asked
+        again after a restart.
+        """
+        reask = 1 if self.question_active else 0
+        return {
+            'game': self.name,
+            'topic': self.topic,
+            'scores': [[user_id, score] for user_id, score in self.scores.items()],
+            'seed': self.deck.seed,
+            'drawn': self.deck.drawn - reask,
+            'question_counter': self.question_counter - reask,
+            'idle_rounds': self.idle_rounds,
+        }
+
+    @classmethod
+    def from_snapshot(cls, bot, channel, snapshot, bank):
+        deck = bank.deck(snapshot['topic'], snapshot['seed'], snapshot['drawn'])
+        game = cls(bot, channel, [], snapshot['topic'], deck)
+        game.scores = {user_id: score for user_id, score in snapshot['scores']}
+        game.player_ids = set(game.scores)
+        game.question_counter = snapshot['question_counter']
+        game.idle_rounds = snapshot['idle_rounds']
+        return game
+
+    def save_snapshot(self):
+        SNAPSHOTS.save(self.channel.id, self.to_snapshot())
+
+    async def resume(self):
+        """Carry on after a restart from the last snapshot."""
+        self.outbox.send(f"Resuming the trivia game after a restart, starting in {self.delays['start']} seconds!")
+        self._schedule(self.delays['start'], self._next_question)
+
+    def _schedule(self, delay, callback, *args):
+        """
+        Queue the next hint, timeout or round transition on the shared timer
+        wheel. Only one is ever pending, so a new one replaces the previous one.
+        """
+        if self.round_timer:
+            self.round_timer.cancel()
+        self.round_timer = WHEEL.call_later(delay, callback, *args)
+
+    def _schedule_round_deadline(self):
+        """Schedule the next hint of the current question, or its reveal once all hints are given."""
+        answer_time = self.delays['answer_time']
+        elapsed = self.HINT_STAGES[self.hint_stage - 1] * answer_time if self.hint_stage else 0
+        if self.hint_stage < len(self.HINT_STAGES):
+            self._schedule(self.HINT_STAGES[self.hint_stage] * answer_time - elapsed, self._give_hint, self.question_counter)
+        else:
+            self._schedule(answer_time - elapsed, self._time_up, self.question_counter)
+
+    async def _give_hint(self, question_number):
+        async with self.lock:
+            if not self.question_active or question_number != self.question_counter:
+                return
+            self.hint_stage += 1
+            hint = hint_for(self.current_question['answer'], self.hint_stage / (len(self.HINT_STAGES) + 1))
+            self.outbox.send(f"Hint: `{hint}`")
+            self._schedule_round_deadline()
+
+    async def _time_up(self, question_number):
+        async with self.lock:
+            if not self.question_active or question_number != self.question_counter:
+                return
+            self._reveal_answer("Time's up! The correct answer was")
+
+            # Stop a game nobody is playing anymore
+            self.idle_rounds += 1
+            if self.idle_rounds >= self.MAX_IDLE_ROUNDS:
+                self.outbox.send("Nobody has answered for a while, so the game is over.")
+                await self.end_game()
+                return
+
+            self._schedule_next_question()
+
+    def _schedule_next_question(self, after_leaderboard=False):
+        # Longer delay after the leaderboard, shorter between regular questions
+        self._schedule(self.delays['after_leaderboard' if after_leaderboard else 'between_questions'], self._announce_next_question)
+
+    def _announce_next_question(self):
+        # Add a chat countdown before the next question
+        self.outbox.send("Next question coming up...")
+        self._schedule(self.delays['countdown'], self._next_question)
+
+    async def _next_question(self):
+        async with self.lock:
+            if self.finished or self.question_active:
+                return
             await self.ask_question()
 
     async def display_leaderboard(self, final=False):
@@ -102,13 +224,35 @@ class TriviaGame:
         Display the leaderboard, either as a final summary or current standings.
         """
         leaderboard = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)
-        leaderboard_message = "\n".join([f"{player.mention}: {score}" for player, score in leaderboard])
+        leaderboard_message = "\n".join([f"<@{user_id}>: {score}" for user_id, score in leaderboard])
         title = "Final Leaderboard:" if final else "Current Leaderboard:"
-        await self.channel.send(f"{title}\n{leaderboard_message}")
+        self.outbox.send(f"{title}\n{leaderboard_message}")
+
+        if final:
+            all_time = await STATS.leaderboard(self.guild_id, self.name, limit=5)
+            if all_time:
+                all_time_message = "\n".join([f"<@{user_id}>: {points}" for user_id, points in all_time])
+                self.outbox.send(f"All-time Trivia Leaderboard:\n{all_time_message}")
+
+    def _record_game(self):
+        STATS.record_game(self.guild_id, self.name, self.scores, topic=TOTAL_TOPIC if self.topic == "all_topics" else self.topic)
+
+    def _stop(self):
+        self.finished = True
+        self.answer_keys = []
+        if self.round_timer:
+            self.round_timer.cancel()
+
+    async def stand_down(self):
+        """Stop running the game in this process without ending it, after another worker took it over."""
+        self._stop()
 
     async def end_game(self):
         """
         Ends the game prematurely and displays the final leaderboard.
         """
-        await self.channel.send("Trivia game has been ended prematurely.")
+        self._stop()
+        self.outbox.send("Trivia game has been ended prematurely.")
+        self._record_game()
+        SNAPSHOTS.discard(self.channel.id)
         await self.display_leaderboard(final=True)
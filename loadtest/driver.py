@@ -0,0 +1,302 @@
+"""
+Load test of the real game classes against the fake Discord in
+loadtest.fake_discord. Runs many games side by side, each with its own
+channel and simulated players who answer every round. Reports throughput,
+answer-to-ack latency and how contended the game locks were.
+
+Run from the repository root, e.g.:
+    python -m loadtest.driver --game trivia --games 200 --players 10 --duration 60
+"""
+import os
+import re
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+# Keep the stats, snapshots and caches of simulated games away from the real ones
+_DATA_DIR = tempfile.mkdtemp(prefix='sgb-loadtest-')
+os.environ.setdefault('SGB_STATS_PATH', os.path.join(_DATA_DIR, 'stats.db'))
+os.environ.setdefault('SGB_SNAPSHOT_PATH', os.path.join(_DATA_DIR, 'games.jsonl'))
+os.environ.setdefault('SGB_CACHE_DIR', os.path.join(_DATA_DIR, 'cache'))
+os.environ.setdefault('SONG_CLIP_CACHE_MB', '0')
+
+from games.registry import GameRegistry
+from games.match_pool import MatchPool
+from games.loop_lag import LoopLagMonitor
+from games.metrics import TimedLock
+from games.threeman import ThreeManGame
+from games.trivia.trivia import TriviaGame
+from games.trivia.topics import TRIVIA_TOPICS
+from games.guess_the_song.guess_the_song import GuessTheSongGame
+from loadtest.fake_discord import (
+    FakeUser, FakeGuild, FakeTextChannel, FakeVoiceChannel, FakeMessage, FakeInteraction,
+)
+
+
+# Lines that acknowledge a player's answer or roll, and the player they are for
+ACK_PATTERN = re.compile(r"^<@(\d+)> (?:answered correctly|guessed|rolled a )")
+# Lines that start a round players can answer
+ROUND_PATTERN = re.compile(r"^(?:Question \d+:|Song now playing!|It's now <@\d+>'s turn|The Threeman position is open|<@\d+>, it's still your turn|<@\d+> is the first roller)")
+WRONG_GUESSES = ["no idea", "is it the blue one?", "lol", "pass", "hmm"]
+
+# Delays of every game, scaled by --pace; the defaults are tuned for humans
+TRIVIA_DELAYS = {'start': 1, 'between_questions': 1, 'after_leaderboard': 1, 'countdown': 0.5, 'answer_time': 10}
+SONG_DELAYS = {'between_songs': 1, 'after_leaderboard': 1, 'answer_time': 10}
+THREEMAN_DELAYS = {'roll': 0.2, 'pass_turn': 0.2, 'open_threeman': 0.2}
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Report:
+    def __init__(self):
+        self.messages = 0  # Chat messages and /roll interactions sent by players
+        self.routed = 0  # Messages the registry passed on to a game
+        self.ack_latencies = []  # Seconds from an answer or roll to its acknowledgement in the channel
+        self.handle_latencies = []  # Seconds spent dispatching one message
+        self.lock_waits = []
+        self.contended = 0
+
+
+    def record_lock(self, wait, contended):
+        self.lock_waits.append(wait)
+        self.contended += contended
+
+
+class LoadTestSongGame(GuessTheSongGame):
+    """Guess the Song with a generated playlist and a resolver that only sleeps."""
+    def __init__(self, *args, tracks, resolve_latency, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fake_tracks = tracks
+        self.resolve_latency = resolve_latency
+
+
+    async def _ingest_sources(self):
+        self.track_table.extend(self.fake_tracks)
+        self.tracks_loaded.set()
+
+
+    async def _resolve_song(self, track):
+        await asyncio.sleep(self.resolve_latency)
+        return f"https://example.invalid/{track.track_id}"
+
+
+    def _audio_source(self):
+        return self.current_song_url
+
+
+class Table:
+    """One simulated game: its channel, players, and the rounds they see."""
+    def __init__(self, registry, report, players, send_latency, match_pool):
+        self.registry = registry
+        self.match_pool = match_pool
+        self.report = report
+        self.guild = FakeGuild()
+        self.channel = FakeTextChannel(self.guild, latency=send_latency)
+        self.players = [FakeUser() for _ in range(players)]
+        self.users = {player.id: player for player in self.players}
+        self.game = None
+        self.pending_acks = {}  # user ID -> time the answer or roll was sent
+        self.round = asyncio.get_running_loop().create_future()
+        self.channel.listeners.append(self._on_send)
+
+
+    def _on_send(self, content):
+        now = time.perf_counter()
+        new_round = False
+        for line in str(content).split("\n"):
+            ack = ACK_PATTERN.match(line)
+            if ack:
+                sent = self.pending_acks.pop(int(ack.group(1)), None)
+                if sent is not None:
+                    self.report.ack_latencies.append(now - sent)
+            if ROUND_PATTERN.match(line):
+                new_round = True
+        if new_round and not self.round.done():
+            self.round.set_result(None)
+            self.round = asyncio.get_running_loop().create_future()
+
+
+    async def next_round(self, timeout):
+        try:
+            await asyncio.wait_for(asyncio.shield(self.round), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+    async def say(self, player, content, is_answer):
+        """Post a chat message the way bot.on_message hands it to the game."""
+        if is_answer:
+            self.pending_acks[player.id] = time.perf_counter()
+        self.report.messages += 1
+        start = time.perf_counter()
+        message = FakeMessage(player, self.channel, content)
+        current_game = self.registry.candidate(message)
+        if current_game:
+            answer_key = await self.match_pool.match(current_game.answer_keys, content)
+            if answer_key is not None:
+                self.report.routed += 1
+                await current_game.handle_answer(message, answer_key)
+        self.report.handle_latencies.append(time.perf_counter() - start)
+
+
+async def play_trivia(table, player, rng, accuracy, think):
+    game = table.game
+    while not game.finished:
+        await table.next_round(timeout=1)
+        if not game.question_active:
+            continue
+        question = game.current_question
+        await asyncio.sleep(rng.uniform(0, think))
+        if game.current_question is not question or not game.question_active:
+            continue
+        if rng.random() < accuracy:
+            await table.say(player, question['answer'], is_answer=True)
+        else:
+            await table.say(player, rng.choice(WRONG_GUESSES), is_answer=False)
+
+
+async def play_song(table, player, rng, accuracy, think):
+    game = table.game
+    while not game.finished:
+        await table.next_round(timeout=1)
+        if not game.question_active:
+            continue
+        track = game.current_track
+        await asyncio.sleep(rng.uniform(0, think))
+        if game.current_track is not track or not game.question_active:
+            continue
+        if rng.random() < accuracy:
+            await table.say(player, rng.choice([track.name, *track.artists]), is_answer=True)
+        else:
+            await table.say(player, rng.choice(WRONG_GUESSES), is_answer=False)
+
+
+async def play_threeman(table, rng, think):
+    """Whoever's turn it is rolls as soon as the previous roll has landed."""
+    game = table.game
+    while not game.finished:
+        if game.rolling or game.roller is None:
+            await table.next_round(timeout=1)
+            continue
+        await asyncio.sleep(rng.uniform(0, think))
+        player = table.users[game.roller]
+        table.pending_acks[player.id] = time.perf_counter()
+        table.report.messages += 1
+        start = time.perf_counter()
+        await game.roll(FakeInteraction(player, table.channel))
+        table.report.handle_latencies.append(time.perf_counter() - start)
+        await table.next_round(timeout=1)
+
+
+def scaled(delays, pace):
+    return {name: delay * pace for name, delay in delays.items()}
+
+
+async def start_table(kind, table, args, rng):
+    if kind == 'trivia':
+        table.game = TriviaGame(
+            None, table.channel, table.players, "all_topics", TRIVIA_TOPICS.deck("all_topics"),
+            delays=scaled(TRIVIA_DELAYS, args.pace),
+        )
+    elif kind == 'song':
+        tracks = [
+            (f"track{index}", f"Song number {index} {rng.choice(['love', 'night', 'road', 'fire'])}", [f"Artist {rng.randrange(1000)}"])
+            for index in range(args.tracks)
+        ]
+        table.game = LoadTestSongGame(
+            None, table.channel, FakeVoiceChannel(table.guild), table.players,
+            tracks=tracks, resolve_latency=args.resolve_latency, delays=scaled(SONG_DELAYS, args.pace),
+        )
+        await table.game.join_voice_channel()
+    else:
+        table.game = ThreeManGame(None, table.channel, table.players, delays=scaled(THREEMAN_DELAYS, args.pace))
+
+    if hasattr(table.game, 'lock'):
+        table.game.lock = TimedLock(table.game.name, observer=table.report.record_lock)
+    await table.registry.add(table.channel, table.game)
+    await table.game.start_game()
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    registry = GameRegistry()
+    report = Report()
+    lag_monitor = LoopLagMonitor(interval=0.05, report_every=0)
+    lag_monitor.start()
+
+    # With 0 workers this matches on the loop, like the bot's default
+    match_pool = MatchPool(args.match_workers)
+    if args.match_workers:
+        await asyncio.wrap_future(match_pool.start())
+    tables = [Table(registry, report, args.players, args.send_latency, match_pool) for _ in range(args.games)]
+    started = time.perf_counter()
+    await asyncio.gather(*(start_table(args.game, table, args, rng) for table in tables))
+
+    if args.game == 'threeman':
+        players = [play_threeman(table, rng, args.think) for table in tables]
+    else:
+        play = play_trivia if args.game == 'trivia' else play_song
+        players = [play(table, player, rng, args.accuracy, args.think) for table in tables for player in table.players]
+    tasks = [asyncio.ensure_future(player) for player in players]
+
+    await asyncio.sleep(args.duration)
+    for table in tables:
+        if not table.game.finished:
+            await table.game.end_game()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    lag_monitor.stop()
+    match_pool.stop()
+
+    print_report(args, report, elapsed, lag_monitor.max_lag)
+
+
+def print_report(args, report, elapsed, max_lag):
+    ms = 1000
+    print(f"game: {args.game}  games: {args.games}  players: {args.games * args.players}  duration: {elapsed:.1f}s")
+    print(f"messages: {report.messages} ({report.messages / elapsed:.1f}/s), routed to a game: {report.routed}")
+    print(
+        f"answer-to-ack latency: p50 {percentile(report.ack_latencies, 0.5) * ms:.1f}ms  "
+        f"p99 {percentile(report.ack_latencies, 0.99) * ms:.1f}ms  (n={len(report.ack_latencies)})"
+    )
+    print(
+        f"dispatch latency: p50 {percentile(report.handle_latencies, 0.5) * ms:.3f}ms  "
+        f"p99 {percentile(report.handle_latencies, 0.99) * ms:.3f}ms"
+    )
+    acquisitions = len(report.lock_waits)
+    contended = report.contended / acquisitions * 100 if acquisitions else 0.0
+    print(
+        f"lock acquisitions: {acquisitions}, contended: {report.contended} ({contended:.1f}%), "
+        f"wait p99 {percentile(report.lock_waits, 0.99) * ms:.3f}ms, max {max(report.lock_waits, default=0) * ms:.3f}ms"
+    )
+    print(f"event loop lag: max {max_lag * ms:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay simulated players against the real game classes.")
+    parser.add_argument('--game', choices=['trivia', 'song', 'threeman'], default='trivia')
+    parser.add_argument('--games', type=int, default=100, help="games running side by side")
+    parser.add_argument('--players', type=int, default=8, help="players per game")
+    parser.add_argument('--duration', type=float, default=30, help="seconds to run for")
+    parser.add_argument('--accuracy', type=float, default=0.3, help="chance a player's guess is right")
+    parser.add_argument('--think', type=float, default=2.0, help="most seconds a player waits before answering")
+    parser.add_argument('--pace', type=float, default=1.0, help="factor applied to every game delay")
+    parser.add_argument('--send-latency', type=float, default=0.05, help="simulated seconds per Discord send")
+    parser.add_argument('--tracks', type=int, default=200, help="songs per simulated playlist")
+    parser.add_argument('--resolve-latency', type=float, default=0.5, help="simulated seconds to resolve a song")
+    parser.add_argument('--match-workers', type=int, default=0, help="processes guesses are matched in, like MATCH_WORKERS; 0 matches on the loop")
+    parser.add_argument('--seed', type=int, default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
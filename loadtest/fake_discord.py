@@ -0,0 +1,148 @@
+"""
+In-process stand-ins for the parts of discord.py the games touch: users,
+guilds, text and voice channels, messages, interactions and voice clients.
+Every send is recorded with the loop time it was delivered at, and can be
+given a simulated round-trip latency.
+"""
+import asyncio
+import itertools
+
+
+_ids = itertools.count(10_000)
+
+
+def next_id():
+    return next(_ids)
+
+
+class FakeUser:
+    def __init__(self, name=None, user_id=None):
+        self.id = next_id() if user_id is None else user_id
+        self.name = name or f"player{self.id}"
+        self.mention = f"<@{self.id}>"
+        self.bot = False
+
+
+    def __str__(self):
+        return self.name
+
+
+class FakeGuild:
+    def __init__(self, guild_id=None):
+        self.id = next_id() if guild_id is None else guild_id
+
+
+class FakeTextChannel:
+    """A text channel whose send() takes latency seconds and records what was sent."""
+    def __init__(self, guild, latency=0.0, channel_id=None):
+        self.id = next_id() if channel_id is None else channel_id
+        self.guild = guild
+        self.latency = latency
+        self.sent = []  # (loop time, content)
+        self.listeners = []  # Called with the content of every message sent
+
+
+    async def send(self, content=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent.append((asyncio.get_running_loop().time(), content))
+        for listener in self.listeners:
+            listener(content)
+        return FakeMessage(None, self, content)
+
+
+class FakeMessage:
+    def __init__(self, author, channel, content):
+        self.id = next_id()
+        self.author = author
+        self.channel = channel
+        self.content = content
+        self.guild = getattr(channel, 'guild', None)
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+
+
+    def is_done(self):
+        return self._done
+
+
+    async def defer(self, ephemeral=False, **kwargs):
+        self._done = True
+
+
+    async def send_message(self, content=None, ephemeral=False, **kwargs):
+        self._done = True
+        self._interaction.sent.append((asyncio.get_running_loop().time(), content))
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self._interaction = interaction
+
+
+    async def send(self, content=None, ephemeral=False, **kwargs):
+        # Follow-ups land in the channel like any other message
+        return await self._interaction.channel.send(content)
+
+
+class FakeInteraction:
+    def __init__(self, user, channel):
+        self.id = next_id()
+        self.user = user
+        self.channel = channel
+        self.guild = channel.guild
+        self.sent = []  # Direct responses, (loop time, content)
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+
+
+class FakeVoiceClient:
+    """Plays nothing; tracks what would be playing so the games can stop and disconnect it."""
+    def __init__(self, channel):
+        self.channel = channel
+        self.source = None
+        self.played = 0
+        self._connected = True
+
+
+    def is_connected(self):
+        return self._connected
+
+
+    def is_playing(self):
+        return self.source is not None
+
+
+    def play(self, source, after=None):
+        self.source = source
+        self.played += 1
+
+
+    def stop(self):
+        self.source = None
+
+
+    async def disconnect(self, force=False):
+        self.source = None
+        self._connected = False
+
+
+    async def move_to(self, channel):
+        self.channel = channel
+
+
+class FakeVoiceChannel:
+    def __init__(self, guild, connect_latency=0.0, channel_id=None):
+        self.id = next_id() if channel_id is None else channel_id
+        self.guild = guild
+        self.connect_latency = connect_latency
+
+
+    async def connect(self, **kwargs):
+        if self.connect_latency:
+            await asyncio.sleep(self.connect_latency)
+        return FakeVoiceClient(self)